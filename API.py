@@ -1,125 +1,76 @@
-import csv
-import openai
 import os
-from dotenv import load_dotenv
+import random
 
-# Load environment variables from .env file
-load_dotenv()
+from src.dataio import iter_dataset_rows
+from src.metrics import calculate_metrics, csv_to_json, iter_csv_batches, iter_csv_rows
+from src.report_cache import ResponseCache
 
-# Get API key from environment variable
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-if not OPENAI_API_KEY:
-    raise RuntimeError("The OPENAI_API_KEY environment variable is not set in .env file.")
+# The OpenAI SDK, python-dotenv and asyncio are imported on first use, so callers that only need
+# the metric functions neither pay for those imports nor need an API key.
+_env_loaded = False
+_client = None
+_report_cache = None
 
-# Initialize OpenAI client
-openai.api_key = OPENAI_API_KEY
+
+def _load_env():
+    """
+    Loads environment variables from the .env file once.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
 
 
-def csv_to_json(file_path):
+def _get_api_key():
     """
-    Transforms CSV file into JSON.
-    :param file_path: Path to the CSV file.
-    :return: JSON data as a list of dictionaries.
+    Reads the OpenAI API key from the environment.
+    :return: API key string.
     """
-    data = []
-    try:
-        with open(file_path, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                data.append(row)
-    except FileNotFoundError:
-        raise FileNotFoundError(f"The file '{file_path}' was not found.")
-    except Exception as e:
-        raise RuntimeError(f"An error occurred while reading the CSV file: {e}")
-    return data
+    _load_env()
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise RuntimeError("The OPENAI_API_KEY environment variable is not set in .env file.")
+    return api_key
 
 
-def calculate_metrics(pnl_data):
+def get_client():
     """
-    Calculates financial analytical metrics based on formulas.
-    :param pnl_data: JSON data as a list of dictionaries (P&L structure).
-    :return: Calculated metrics as a dictionary.
+    Returns the shared OpenAI client, creating it on the first report request.
+    :return: openai.OpenAI instance.
     """
-    metrics_dict = {}
-    for item in pnl_data:
-        try:
-            metric_name = item.get('metric', '').strip()
-            amount = item.get('amount_month_usd')
-            # Handle different data types
-            if isinstance(amount, str):
-                amount = amount.replace(',', '').strip()
-            elif isinstance(amount, (int, float)):
-                amount = float(amount)
-            else:
-                amount = 0.0
-            metrics_dict[metric_name] = float(amount) if amount else 0.0
-        except (ValueError, KeyError):
-            metrics_dict[metric_name] = 0.0
-
-    calculated_metrics = {}
-    total_revenue = metrics_dict.get("Total Revenue", 0.0)
-    net_profit_before_tax = metrics_dict.get("Net Profit Before Tax", 0.0)
+    global _client
+    if _client is None:
+        import openai
+        _client = openai.OpenAI(api_key=_get_api_key())
+    return _client
 
-    try:
-        calculated_metrics["Gross Profit Margin"] = (
-            (metrics_dict.get("Gross Profit", 0.0) / total_revenue) * 100
-            if total_revenue else 0.0
-        )
-        calculated_metrics["Operating Profit Margin"] = (
-            (metrics_dict.get("Operating Profit (EBIT)", 0.0) / total_revenue) * 100
-            if total_revenue else 0.0
-        )
-        calculated_metrics["Net Profit Margin"] = (
-            (metrics_dict.get("Net Profit After Tax", 0.0) / total_revenue) * 100
-            if total_revenue else 0.0
-        )
-        calculated_metrics["COGS Percentage"] = (
-            (metrics_dict.get("Total COGS", 0.0) / total_revenue) * 100
-            if total_revenue else 0.0
-        )
-        calculated_metrics["Operating Expense Ratio"] = (
-            (metrics_dict.get("Total Operating Expenses", 0.0) / total_revenue) * 100
-            if total_revenue else 0.0
-        )
-        calculated_metrics["Marketing Efficiency"] = (
-            metrics_dict.get("Total Revenue", 0.0) / metrics_dict.get("Marketing & Advertising", 1.0)
-            if metrics_dict.get("Marketing & Advertising", 0.0) else 0.0
-        )
-        calculated_metrics["Salaries & Wages Percentage"] = (
-            (metrics_dict.get("Salaries & Wages", 0.0) / total_revenue) * 100
-            if total_revenue else 0.0
-        )
-        calculated_metrics["Interest Coverage Ratio"] = (
-            metrics_dict.get("Operating Profit (EBIT)", 0.0) / metrics_dict.get("Interest Expense", 1.0)
-            if metrics_dict.get("Interest Expense", 0.0) else 0.0
-        )
-        calculated_metrics["Depreciation Percentage"] = (
-            (metrics_dict.get("Depreciation", 0.0) / total_revenue) * 100
-            if total_revenue else 0.0
-        )
-        calculated_metrics["Other Expenses Percentage"] = (
-            (metrics_dict.get("Other Expenses", 0.0) / total_revenue) * 100
-            if total_revenue else 0.0
-        )
-        calculated_metrics["Net Other Income Percentage"] = (
-            (metrics_dict.get("Net Other Income/Expense", 0.0) / total_revenue) * 100
-            if total_revenue else 0.0
-        )
-        calculated_metrics["Income Tax Percentage"] = (
-            (metrics_dict.get("Income Tax Expense", 0.0) / net_profit_before_tax) * 100
-            if net_profit_before_tax else 0.0
-        )
-    except ZeroDivisionError:
-        raise ValueError("Division by zero encountered in metric calculations.")
 
-    return calculated_metrics
+def get_report_cache():
+    """
+    Returns the shared on-disk response cache, creating it on first use.
+    Configured through REPORT_CACHE_PATH (empty to disable), REPORT_CACHE_TTL and REPORT_CACHE_MAX_ENTRIES.
+    :return: ResponseCache instance, or None when caching is disabled.
+    """
+    global _report_cache
+    if _report_cache is None:
+        _load_env()
+        path = os.getenv('REPORT_CACHE_PATH', '.report_cache.sqlite')
+        if path:
+            _report_cache = ResponseCache(
+                path,
+                ttl_seconds=float(os.getenv('REPORT_CACHE_TTL', 7 * 24 * 3600)),
+                max_entries=int(os.getenv('REPORT_CACHE_MAX_ENTRIES', 512)),
+            )
+    return _report_cache
 
 
-def generate_report(data):
+def build_report_request(data):
     """
-    Generates a report with insights and recommendations based on data.
+    Builds the chat completions request for a report.
     :param data: Dictionary containing either metrics or a prompt.
-    :return: AI-generated report as a string.
+    :return: Dictionary of keyword arguments for openai.chat.completions.create.
     """
     if "prompt" in data:
         prompt = data["prompt"]
@@ -132,27 +83,189 @@ def generate_report(data):
         for metric, value in data.items():
             prompt += f"{metric}: {value:.2f}\n"
 
+    return {
+        "model": "gpt-4",
+        "messages": [
+            {"role": "system", "content": "You are a financial advisor providing clear, actionable insights."},
+            {"role": "user", "content": prompt},
+        ],
+        "max_tokens": 1000,
+        "temperature": 0.7,
+    }
+
+
+def generate_report(data, use_cache=True, stream=False):
+    """
+    Generates a report with insights and recommendations based on data.
+    Identical requests are answered from the on-disk response cache.
+    :param data: Dictionary containing either metrics or a prompt.
+    :param use_cache: Whether to read from and write to the response cache.
+    :param stream: If True, return a generator yielding the report text as it arrives.
+    :return: AI-generated report as a string, or a generator of text chunks when streaming.
+    """
+    request = build_report_request(data)
+    cache = get_report_cache() if use_cache else None
+    if stream:
+        return _stream_report(request, cache)
+
+    if cache is not None:
+        cached = cache.get(request)
+        if cached is not None:
+            return cached
+
+    import openai
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a financial advisor providing clear, actionable insights."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=1000,
-            temperature=0.7,
-        )
-        return response.choices[0].message.content
+        response = get_client().chat.completions.create(**request)
+        report = response.choices[0].message.content
     except openai.OpenAIError as e:
         raise RuntimeError(f"OpenAI API error: {e}")
 
+    if cache is not None and report is not None:
+        cache.set(request, report)
+    return report
+
+
+def _stream_report(request, cache):
+    """
+    Yields report text chunks as the completion streams in, caching the full text once it is complete.
+    """
+    if cache is not None:
+        cached = cache.get(request)
+        if cached is not None:
+            yield cached
+            return
+
+    import openai
+    chunks = []
+    try:
+        for event in get_client().chat.completions.create(**request, stream=True):
+            text = event.choices[0].delta.content if event.choices else None
+            if text:
+                chunks.append(text)
+                yield text
+    except openai.OpenAIError as e:
+        raise RuntimeError(f"OpenAI API error: {e}")
+
+    if cache is not None and chunks:
+        cache.set(request, "".join(chunks))
+
+
+async def _agenerate_report(data, get_async_client, max_retries, base_delay, max_delay, use_cache):
+    """
+    Looks the request up in the response cache and only asks get_async_client for a client on a miss.
+    """
+    import asyncio
+    import openai
+
+    request = build_report_request(data)
+    cache = get_report_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(request)
+        if cached is not None:
+            return cached
+
+    client = get_async_client()
+    for attempt in range(max_retries + 1):
+        try:
+            response = await client.chat.completions.create(**request)
+            break
+        except openai.RateLimitError as e:
+            if attempt == max_retries:
+                raise RuntimeError(f"OpenAI API error: {e}")
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+        except openai.OpenAIError as e:
+            raise RuntimeError(f"OpenAI API error: {e}")
+
+    report = response.choices[0].message.content
+    if cache is not None and report is not None:
+        cache.set(request, report)
+    return report
+
+
+def _lazy_async_client(clients):
+    """
+    Returns a function that creates one openai.AsyncOpenAI client on its first call and appends it
+    to clients, so the caller can close it; cached reports never need a client or an API key.
+    """
+    def get_async_client():
+        if not clients:
+            import openai
+            clients.append(openai.AsyncOpenAI(api_key=_get_api_key(), max_retries=0))
+        return clients[0]
+    return get_async_client
+
+
+async def agenerate_report(data, client=None, max_retries=5, base_delay=1.0, max_delay=30.0, use_cache=True):
+    """
+    Asynchronously generates a report, retrying rate-limited requests with jittered exponential backoff.
+    :param data: Dictionary containing either metrics or a prompt.
+    :param client: Optional openai.AsyncOpenAI client; a temporary one is created on a cache miss if omitted.
+    :param max_retries: Number of retries after a rate-limit error before giving up.
+    :param base_delay: Backoff cap in seconds for the first retry; doubles on every attempt.
+    :param max_delay: Upper bound in seconds for a single backoff.
+    :param use_cache: Whether to read from and write to the response cache.
+    :return: AI-generated report as a string.
+    """
+    if client is not None:
+        return await _agenerate_report(data, lambda: client, max_retries, base_delay, max_delay, use_cache)
+
+    clients = []
+    try:
+        return await _agenerate_report(data, _lazy_async_client(clients), max_retries, base_delay, max_delay,
+                                       use_cache)
+    finally:
+        for own_client in clients:
+            await own_client.close()
+
+
+async def agenerate_reports(items, max_concurrency=4, max_retries=5, base_delay=1.0, max_delay=30.0,
+                            use_cache=True):
+    """
+    Generates many reports concurrently with at most max_concurrency requests in flight.
+    One client is shared by all requests and created on the first cache miss.
+    :param items: Iterable of dictionaries accepted by generate_report.
+    :param max_concurrency: Maximum number of simultaneous API requests.
+    :param max_retries: Number of retries after a rate-limit error before giving up.
+    :param base_delay: Backoff cap in seconds for the first retry; doubles on every attempt.
+    :param max_delay: Upper bound in seconds for a single backoff.
+    :param use_cache: Whether to read from and write to the response cache.
+    :return: List of reports in the same order as items.
+    """
+    import asyncio
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be a positive integer.")
+    semaphore = asyncio.Semaphore(max_concurrency)
+    clients = []
+    get_async_client = _lazy_async_client(clients)
+
+    async def run(data):
+        async with semaphore:
+            return await _agenerate_report(data, get_async_client, max_retries, base_delay, max_delay, use_cache)
+
+    try:
+        return await asyncio.gather(*(run(data) for data in items))
+    finally:
+        for client in clients:
+            await client.close()
+
+
+def generate_reports(items, max_concurrency=4, **kwargs):
+    """
+    Blocking wrapper around agenerate_reports for synchronous callers.
+    :param items: Iterable of dictionaries accepted by generate_report.
+    :param max_concurrency: Maximum number of simultaneous API requests.
+    :return: List of reports in the same order as items.
+    """
+    import asyncio
+    return asyncio.run(agenerate_reports(items, max_concurrency=max_concurrency, **kwargs))
+
 
 if __name__ == "__main__":
     # Example usage
     csv_file_path = "Profit_and_Loss_Statement.csv"  # Replace with your actual file path
     try:
-        json_data = csv_to_json(csv_file_path)
-        metrics = calculate_metrics(json_data)
+        metrics = calculate_metrics(iter_csv_rows(csv_file_path))
         report = generate_report(metrics)
         print("\nGenerated Report:\n")
         print(report)
@@ -0,0 +1,44 @@
+"""
+Measures the "Balance Trend Over Time" figure with and without server-side downsampling:
+number of points, serialized JSON size and serialization time.
+
+Usage: python benchmarks/bench_balance_trend.py [--rows 500000] [--max-points 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_personal_finance import make_transactions
+from src.main import create_visualizations
+
+
+def measure(df, max_points):
+    start = time.perf_counter()
+    figure = create_visualizations(df, max_points=max_points)[2]
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    payload = figure.to_json()
+    serialize_seconds = time.perf_counter() - start
+    return len(figure.data[0].x), len(payload), build_seconds, serialize_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--max-points', type=int, default=2000)
+    args = parser.parse_args()
+
+    df = make_transactions(args.rows, categories=40)
+    print(f"{len(df):,} transactions")
+    for label, max_points in (('full', None), ('downsampled', args.max_points)):
+        points, size, build_seconds, serialize_seconds = measure(df, max_points)
+        print(
+            f"{label:12s} {points:>9,} points  {size / 1e6:8.2f} MB  "
+            f"build {build_seconds:6.3f}s  to_json {serialize_seconds:6.3f}s"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Compares looping calculate_metrics over every statement with calculate_metrics_batch.
+
+Usage: python benchmarks/bench_batch_metrics.py [--entities 400] [--periods 100]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.metrics import RATIOS, calculate_metrics, calculate_metrics_batch
+
+
+def make_statements(entities, periods, seed=0):
+    """
+    Builds a synthetic long-format frame of (entity, period, metric, amount) rows.
+    """
+    rng = np.random.default_rng(seed)
+    metrics = sorted({name for numerator, denominator, _ in RATIOS.values() for name in (numerator, denominator)})
+    index = pd.MultiIndex.from_product(
+        [[f"E{i}" for i in range(entities)], [f"P{j}" for j in range(periods)], metrics],
+        names=['entity', 'period', 'metric'],
+    )
+    frame = index.to_frame(index=False)
+    frame['amount'] = rng.uniform(1_000, 250_000, len(frame)).round(2)
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entities', type=int, default=400)
+    parser.add_argument('--periods', type=int, default=100)
+    args = parser.parse_args()
+
+    frame = make_statements(args.entities, args.periods)
+    statements = args.entities * args.periods
+    print(f"{statements:,} statements, {len(frame):,} rows")
+
+    start = time.perf_counter()
+    looped = {
+        key: calculate_metrics(
+            {'metric': metric, 'amount_month_usd': amount}
+            for metric, amount in zip(group['metric'], group['amount'])
+        )
+        for key, group in frame.groupby(['entity', 'period'], sort=False)
+    }
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = calculate_metrics_batch(frame)
+    batch_seconds = time.perf_counter() - start
+
+    key = next(iter(looped))
+    assert np.allclose(list(looped[key].values()), table.loc[key].to_numpy())
+    print(f"loop:  {loop_seconds:8.3f}s")
+    print(f"batch: {batch_seconds:8.3f}s  ({loop_seconds / batch_seconds:,.0f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
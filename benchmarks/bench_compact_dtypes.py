@@ -0,0 +1,46 @@
+"""
+Reports the memory of a cleaned personal finance ledger before and after dtype compaction,
+and the time of the category aggregation on both.
+
+Usage: python benchmarks/bench_compact_dtypes.py [--rows 5000000] [--categories 40]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_personal_finance import make_transactions
+from src.aggregation import aggregate_transactions
+from src.cleaning import clean_transactions, compact_dtypes, frame_memory
+
+
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--categories', type=int, default=40)
+    args = parser.parse_args()
+
+    raw = make_transactions(args.rows, args.categories)
+    # Uploads arrive as object strings, as read from CSV
+    raw['Category'] = raw['Category'].astype(object)
+    cleaned, _, _ = clean_transactions(raw)
+    compact = compact_dtypes(cleaned)
+
+    for label, df in (('before', cleaned), ('after', compact)):
+        print(f"{label:>6}: {frame_memory(df) / 1e6:9.1f} MB  "
+              f"aggregate {timed(aggregate_transactions, df) * 1000:8.1f} ms  "
+              f"dtypes {', '.join(f'{name}={dtype}' for name, dtype in df.dtypes.items())}")
+
+
+if __name__ == '__main__':
+    main()
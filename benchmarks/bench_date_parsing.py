@@ -0,0 +1,62 @@
+"""
+Compares personal finance date handling before and after format-hinted parsing.
+Before: validation parsed the Date column and discarded it, then cleaning parsed it
+again with format inference. After: one parse of the distinct values with a detected explicit
+format, shared between validation and cleaning.
+
+Usage: python benchmarks/bench_date_parsing.py [--rows 5000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_personal_finance import make_transactions
+from src.cleaning import clean_transactions
+from src.main import validate_and_parse_csv
+
+LAYOUTS = {'ISO': '%Y-%m-%d', 'US': '%m/%d/%Y', 'ISO with time': '%Y-%m-%d %H:%M:%S'}
+
+
+def legacy(df):
+    """
+    The previous validation plus cleaning: two full parses with format inference.
+    """
+    df = df.copy()
+    pd.to_datetime(df['Date'])
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    return df
+
+
+def shared(df):
+    _, _, df = validate_and_parse_csv(df)
+    return clean_transactions(df)[0]
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    base = make_transactions(args.rows, 40)
+    for label, date_format in LAYOUTS.items():
+        df = base.assign(Date=base['Date'].dt.strftime(date_format))
+        before, legacy_seconds = timed(legacy, df)
+        after, shared_seconds = timed(shared, df)
+        assert before['Date'].equals(after['Date'])
+        print(f"{label:>14}: before {args.rows / legacy_seconds:>12,.0f} rows/s  "
+              f"after {args.rows / shared_seconds:>12,.0f} rows/s  "
+              f"({legacy_seconds / shared_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures `python -X importtime` for the metric entry points against a fixed budget.
+
+Usage: python benchmarks/bench_import_time.py [--budget-ms 25] [--runs 5]
+Exits with status 1 when the best run of any statement exceeds the budget.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = [
+    "from src.metrics import calculate_metrics",
+    "from API import calculate_metrics, csv_to_json",
+]
+
+# Modules that must stay out of the metric import path
+HEAVY_MODULES = ('openai', 'dotenv', 'pandas', 'numpy', 'plotly', 'streamlit')
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(statement, baseline=frozenset()):
+    """
+    Runs one import in a fresh interpreter without an API key.
+    :param statement: Python import statement to time.
+    :param baseline: Top-level modules imported by interpreter startup, excluded from the total.
+    :return: Tuple of (cumulative microseconds of the statement's top-level imports, set of imported modules).
+    """
+    env = {k: v for k, v in os.environ.items() if k != 'OPENAI_API_KEY'}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    total = 0
+    modules = set()
+    for match in _LINE.finditer(result.stderr):
+        _, cumulative, indent, module = match.groups()
+        modules.add(module)
+        if len(indent) == 1 and module not in baseline:
+            total += int(cumulative)
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--budget-ms', type=float, default=25.0)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    _, baseline = measure('pass')
+    over_budget = False
+    for statement in STATEMENTS:
+        runs = [measure(statement, baseline) for _ in range(args.runs)]
+        best_ms = min(total for total, _ in runs) / 1000
+        heavy = sorted(m for m in runs[0][1] if m.split('.')[0] in HEAVY_MODULES)
+        status = 'ok' if best_ms <= args.budget_ms and not heavy else 'OVER BUDGET'
+        over_budget |= status != 'ok'
+        print(f"{statement:55s} {best_ms:7.1f} ms  (budget {args.budget_ms:.0f} ms)  {status}")
+        if heavy:
+            print(f"    heavy imports: {', '.join(heavy)}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
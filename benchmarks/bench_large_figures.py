@@ -0,0 +1,71 @@
+"""
+Compares the SVG figures with the WebGL/aggregated path on synthetic 1M-row datasets.
+Reports figure build time, JSON serialization time and payload size; browser-side
+render time follows the payload and trace type and is not measured here.
+
+Usage: python benchmarks/bench_large_figures.py [--rows 1000000]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_personal_finance import make_transactions
+from src.main import create_investment_visualizations, create_visualizations
+
+
+def make_portfolio(rows, seed=0):
+    """
+    Builds a synthetic portfolio with one lot per row.
+    """
+    rng = np.random.default_rng(seed)
+    purchase = rng.uniform(100, 10_000, rows).round(2)
+    current = (purchase * rng.lognormal(0.05, 0.3, rows)).round(2)
+    return pd.DataFrame({
+        'Asset': [f"A{i}" for i in range(rows)],
+        'Type': np.array(['Stock', 'Bond', 'ETF', 'Crypto', 'REIT'], dtype=object)[rng.integers(0, 5, rows)],
+        'Purchase_Price': purchase,
+        'Current_Value': current,
+        'Annual_Return': rng.normal(8, 15, rows).round(2),
+        'Gain_Loss': current - purchase,
+    })
+
+
+def measure(build):
+    start = time.perf_counter()
+    figures = build()
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    size = sum(len(figure.to_json()) for figure in figures)
+    return build_seconds, time.perf_counter() - start, size, sorted({trace.type for f in figures for trace in f.data})
+
+
+def report(label, result):
+    build_seconds, serialize_seconds, size, traces = result
+    print(f"  {label:22s} build {build_seconds:7.3f}s  to_json {serialize_seconds:7.3f}s  "
+          f"{size / 1e6:9.2f} MB  traces: {', '.join(traces)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    transactions = make_transactions(args.rows, categories=40)
+    print(f"Personal finance, {args.rows:,} transactions (no downsampling)")
+    report('svg', measure(lambda: create_visualizations(transactions, max_points=None, webgl_threshold=math.inf)))
+    report('webgl', measure(lambda: create_visualizations(transactions, max_points=None)))
+
+    portfolio = make_portfolio(args.rows)
+    print(f"Investment portfolio, {args.rows:,} holdings")
+    report('per-asset svg', measure(lambda: create_investment_visualizations(portfolio, webgl_threshold=math.inf)))
+    report('aggregated', measure(lambda: create_investment_visualizations(portfolio)))
+
+
+if __name__ == '__main__':
+    main()
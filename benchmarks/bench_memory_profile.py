@@ -0,0 +1,94 @@
+"""
+Profiles peak memory of cleaning plus analysis with tracemalloc, comparing the previous mutating
+pipeline (in-place column writes, dropna on the written frame and a defensive copy before
+analysis) with the non-mutating one under Copy-on-Write. Both pipelines compute the same results:
+for portfolios the per-lot gain/loss, return and annualized return, the per-type sums and the XIRR.
+
+Usage: python benchmarks/bench_memory_profile.py [--rows 2000000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_large_figures import make_portfolio
+from benchmarks.bench_personal_finance import make_transactions
+from src.aggregation import aggregate_transactions
+from src.cleaning import clean_holdings, clean_transactions, enable_copy_on_write
+from src.main import analyze_investment_portfolio
+from src.portfolio import annualized_returns, portfolio_xirr, summarize_type_sums, type_sums
+
+
+def legacy_finance(df):
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.dropna(subset=['Date'])
+    df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
+    df = df.dropna(subset=['Amount'])
+    working = df.copy()
+    working['Type'] = working['Amount'].apply(lambda x: 'Income' if x > 0 else 'Expense')
+    return df, working.groupby(['Category', 'Type'])['Amount'].sum()
+
+
+def current_finance(df):
+    df, _, _ = clean_transactions(df)
+    return df, aggregate_transactions(df)
+
+
+def legacy_portfolio(df):
+    df['Purchase_Date'] = pd.to_datetime(df['Purchase_Date'], errors='coerce')
+    for col in ['Purchase_Price', 'Current_Value', 'Annual_Return']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.dropna()
+    working = df.copy()
+    working['Gain_Loss'] = working['Current_Value'] - working['Purchase_Price']
+    working['Return_Percentage'] = (working['Gain_Loss'] / working['Purchase_Price']) * 100
+    working['Annualized_Return'] = annualized_returns(
+        working['Purchase_Price'], working['Current_Value'], working['Purchase_Date'])
+    return df, {
+        **summarize_type_sums(type_sums(working)),
+        'xirr': portfolio_xirr(working['Purchase_Price'], working['Current_Value'], working['Purchase_Date']),
+    }
+
+
+def current_portfolio(df):
+    df, _ = clean_holdings(df)
+    return df, analyze_investment_portfolio(df)
+
+
+def peak_mb(func, df):
+    """
+    Peak memory allocated while func runs on a private copy of df, in MB.
+    """
+    df = df.copy()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    args = parser.parse_args()
+    enable_copy_on_write()
+
+    transactions = make_transactions(args.rows, 40)
+    transactions['Date'] = transactions['Date'].dt.strftime('%Y-%m-%d')
+    portfolio = make_portfolio(args.rows).drop(columns='Gain_Loss')
+    portfolio['Purchase_Date'] = '2024-01-02'
+
+    for label, legacy, current, df in (
+        ('personal finance', legacy_finance, current_finance, transactions),
+        ('investment portfolio', legacy_portfolio, current_portfolio, portfolio),
+    ):
+        before, after = peak_mb(legacy, df), peak_mb(current, df)
+        print(f"{label:>20}: peak before {before:8.1f} MB  after {after:8.1f} MB  ({before - after:+.1f} MB avoided)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Measures how personal finance cleaning and aggregation throughput scales with worker processes.
+A synthetic CSV ledger is split into partitions that are parsed, cleaned and aggregated in a
+process pool; throughput should grow close to linearly up to the number of physical cores.
+
+Usage: python benchmarks/bench_parallel_aggregation.py [--rows 5000000] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_personal_finance import make_transactions
+from src.parallel import aggregate_sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--categories', type=int, default=40)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    data = make_transactions(args.rows, args.categories).to_csv(index=False).encode('utf-8')
+    print(f"{args.rows:,} rows, {len(data) / 1e6:.0f} MB of CSV, {os.cpu_count()} CPUs")
+
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        result = aggregate_sources([data], max_workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"  {workers:>2} worker(s): {elapsed:7.2f} s  {result['rows'] / elapsed:>12,.0f} rows/s  "
+              f"speedup {baseline / elapsed:4.2f}x")
+
+
+if __name__ == '__main__':
+    main()
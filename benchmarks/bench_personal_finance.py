@@ -0,0 +1,74 @@
+"""
+Compares the row-wise personal finance analysis with the single-pass aggregation kernel.
+
+Usage: python benchmarks/bench_personal_finance.py [--rows 10000000] [--categories 40]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.aggregation import aggregate_transactions
+
+
+def make_transactions(rows, categories, seed=0):
+    """
+    Builds a synthetic ledger with a mix of income and expense rows.
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Category {i}" for i in range(categories)], dtype=object)
+    return pd.DataFrame({
+        'Category': names[rng.integers(0, categories, rows)],
+        'Amount': rng.normal(-20, 400, rows).round(2),
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+    })
+
+
+def legacy_analysis(df):
+    """
+    The previous analyze_personal_finance plus the re-filtering done by create_visualizations.
+    """
+    df = df.copy()
+    df['Type'] = df['Amount'].apply(lambda x: 'Income' if x > 0 else 'Expense')
+    total_income = df[df['Amount'] > 0]['Amount'].sum()
+    total_expenses = abs(df[df['Amount'] < 0]['Amount'].sum())
+    category_summary = df.groupby(['Category', 'Type'])['Amount'].sum().reset_index()
+    income_df = df[df['Amount'] > 0]
+    expense_df = df[df['Amount'] < 0].copy()
+    expense_df['Amount'] = abs(expense_df['Amount'])
+    pie = [income_df['Amount'].sum(), expense_df['Amount'].sum()]
+    category_totals = df.groupby('Category')['Amount'].sum()
+    return total_income, total_expenses, category_summary, pie, category_totals
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--categories', type=int, default=40)
+    args = parser.parse_args()
+
+    df = make_transactions(args.rows, args.categories)
+    print(f"{len(df):,} rows, {args.categories} categories")
+
+    legacy, legacy_seconds = timed(legacy_analysis, df)
+    kernel, kernel_seconds = timed(aggregate_transactions, df)
+
+    assert np.isclose(legacy[0], kernel['total_income'])
+    assert np.isclose(legacy[1], kernel['total_expenses'])
+    assert np.allclose(legacy[2]['Amount'], kernel['category_summary']['Amount'])
+    print(f"row-wise: {legacy_seconds:8.3f}s")
+    print(f"kernel:   {kernel_seconds:8.3f}s  ({legacy_seconds / kernel_seconds:,.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Times the returns engine on a synthetic portfolio: per-lot annualized returns from
+Purchase_Date and the portfolio XIRR across all lots.
+
+Usage: python benchmarks/bench_portfolio_returns.py [--lots 100000] [--years 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_large_figures import make_portfolio
+from src.portfolio import annualized_returns, portfolio_xirr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lots', type=int, default=100_000)
+    parser.add_argument('--years', type=int, default=10)
+    args = parser.parse_args()
+
+    as_of = pd.Timestamp('2025-01-01')
+    rng = np.random.default_rng(1)
+    df = make_portfolio(args.lots).assign(
+        Purchase_Date=as_of - pd.to_timedelta(rng.integers(0, 365 * args.years, args.lots), unit='D')
+    )
+
+    start = time.perf_counter()
+    returns = annualized_returns(df['Purchase_Price'], df['Current_Value'], df['Purchase_Date'], as_of)
+    middle = time.perf_counter()
+    rate = portfolio_xirr(df['Purchase_Price'], df['Current_Value'], df['Purchase_Date'], as_of)
+    end = time.perf_counter()
+
+    print(f"{args.lots:,} lots over {args.years} years")
+    print(f"  annualized returns: {(middle - start) * 1000:8.1f} ms  (median {returns.median():.2f}%)")
+    print(f"  portfolio XIRR:     {(end - middle) * 1000:8.1f} ms  ({rate:.2f}%)")
+    print(f"  total:              {(end - start) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Times price-history ingestion: the first load parses the file and writes the .npy cache, later
+loads memory-map it. Also times the daily portfolio value, drawdown and volatility series.
+
+Usage: python benchmarks/bench_price_history.py [--years 10] [--tickers 5000] [--lots 10000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.prices import load_price_history, portfolio_time_series
+
+
+def make_prices(years, tickers, seed=0):
+    """
+    Builds a long (date, asset, close) table of geometric random walks as Parquet bytes.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2015-01-01', periods=252 * years)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, (len(dates), tickers)), axis=0))
+    prices = pd.DataFrame({
+        'date': np.repeat(dates.values, tickers),
+        'asset': np.tile(np.array([f"T{i:05d}" for i in range(tickers)]), len(dates)),
+        'close': closes.ravel().round(4),
+    })
+    return prices.to_parquet(index=False), dates
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--tickers', type=int, default=5000)
+    parser.add_argument('--lots', type=int, default=10_000)
+    args = parser.parse_args()
+
+    data, dates = make_prices(args.years, args.tickers)
+    rng = np.random.default_rng(1)
+    holdings = pd.DataFrame({
+        'Asset': [f"T{i:05d}" for i in rng.integers(0, args.tickers, args.lots)],
+        'Purchase_Date': dates[rng.integers(0, len(dates), args.lots)],
+        'Purchase_Price': rng.uniform(100, 10_000, args.lots),
+    })
+    print(f"{len(dates):,} dates x {args.tickers:,} tickers, {len(data) / 1e6:.0f} MB Parquet")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _, first = timed(load_price_history, data, cache_dir)
+        prices, cached = timed(load_price_history, data, cache_dir)
+        (series, _), elapsed = timed(portfolio_time_series, holdings, prices)
+    print(f"  first load (parse + cache): {first * 1000:9.1f} ms")
+    print(f"  cached load (memory map):   {cached * 1000:9.1f} ms")
+    print(f"  {args.lots:,}-lot time series:   {elapsed * 1000:9.1f} ms  "
+          f"(max drawdown {series['Drawdown'].min():.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.cleaning import clean_transactions
+
+
+def category_type_sums(df):
+    """
+    Sums Amount per (Category, Is_Income) in a single grouped pass.
+    Positive amounts count as income; zero and negative amounts as expenses.
+    :param df: DataFrame with Category and numeric Amount columns.
+    :return: Series of sums indexed by (Category, Is_Income), with Category as plain labels.
+    """
+    amounts = df['Amount']
+    # The sign flag only exists inside the grouping, so it never reaches displayed or exported frames
+    is_income = pd.Series(amounts.to_numpy() > 0, index=df.index, name='Is_Income')
+    sums = amounts.groupby([df['Category'], is_income], sort=True, observed=True).sum()
+    # Partial sums from chunks, partitions and saved history are added together, so their
+    # index must not depend on each frame's categories
+    categories = sums.index.levels[0]
+    if isinstance(categories.dtype, pd.CategoricalDtype):
+        sums.index = sums.index.set_levels(categories.astype(categories.dtype.categories.dtype), level='Category')
+    return sums
+
+
+def summarize_category_sums(sums):
+    """
+    Derives every personal-finance aggregate from the per-(Category, Is_Income) sums.
+    Works on the output of category_type_sums or on several of them added together.
+    :param sums: Series of sums indexed by (Category, Is_Income).
+    :return: Dictionary with totals, the category/type summary and per-category totals.
+    """
+    income_mask = sums.index.get_level_values('Is_Income').to_numpy(dtype=bool)
+    total_income = sums[income_mask].sum()
+    total_expenses = abs(sums[~income_mask].sum())
+
+    category_summary = sums.rename('Amount').reset_index()
+    category_summary.insert(1, 'Type', np.where(category_summary.pop('Is_Income'), 'Income', 'Expense'))
+
+    return {
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'net_savings': total_income - total_expenses,
+        'category_summary': category_summary,
+        'category_totals': sums.groupby(level='Category', sort=True, observed=True).sum(),
+        'category_type_sums': sums,
+    }
+
+
+def aggregate_transactions(df):
+    """
+    Single-pass aggregation kernel for personal finance transactions.
+    The Amount column is scanned once; totals and summaries are derived from the grouped result.
+    :param df: DataFrame with Category and numeric Amount columns.
+    :return: Dictionary as returned by summarize_category_sums.
+    """
+    return summarize_category_sums(category_type_sums(df))
+
+
+def partial_aggregate(df):
+    """
+    Cleans one chunk or partition of raw transactions and aggregates it into mergeable partial results.
+    :param df: Raw DataFrame with Category, Amount and Date columns.
+    :return: Dictionary with the per-(Category, Is_Income) sums, per-day totals and row counts.
+    """
+    df, invalid_dates, invalid_amounts = clean_transactions(df)
+    return {
+        'category_type_sums': category_type_sums(df),
+        'daily_totals': df['Amount'].groupby(df['Date'].dt.normalize().rename('Date')).sum(),
+        'rows': len(df),
+        'invalid_dates': invalid_dates,
+        'invalid_amounts': invalid_amounts,
+    }
+
+
+def combine_partials(partials):
+    """
+    Adds up partial results from partial_aggregate into one partial result.
+    :param partials: Iterable of partial result dictionaries; consumed one at a time.
+    :return: Partial result dictionary, or None if partials is empty.
+    """
+    combined = None
+    for partial in partials:
+        if combined is None:
+            combined = dict(partial)
+            continue
+        combined['category_type_sums'] = combined['category_type_sums'].add(
+            partial['category_type_sums'], fill_value=0.0)
+        combined['daily_totals'] = combined['daily_totals'].add(partial['daily_totals'], fill_value=0.0)
+        for key in ('rows', 'invalid_dates', 'invalid_amounts'):
+            combined[key] += partial[key]
+    return combined
+
+
+def merge_partials(partials):
+    """
+    Reduces partial results from partial_aggregate into the full personal-finance analysis.
+    :param partials: Iterable of partial result dictionaries; consumed one at a time.
+    :return: Dictionary as returned by summarize_category_sums, plus daily_totals, the end-of-day
+        balance_trend and the rows / invalid_dates / invalid_amounts counts.
+    """
+    combined = combine_partials(partials)
+    if combined is None:
+        combined = partial_aggregate(pd.DataFrame({'Category': [], 'Amount': [], 'Date': []}))
+
+    daily = combined['daily_totals'].sort_index().rename('Amount')
+    result = summarize_category_sums(combined['category_type_sums'].sort_index().rename('Amount'))
+    result['daily_totals'] = daily
+    result['balance_trend'] = daily.cumsum().rename('Cumulative Balance').reset_index()
+    for key in ('rows', 'invalid_dates', 'invalid_amounts'):
+        result[key] = combined[key]
+    return result
+
+
+def aggregate_transaction_chunks(chunks):
+    """
+    Out-of-core personal-finance analysis: each raw chunk is cleaned and aggregated on its own
+    and only the small partial results are kept, so peak memory is bounded by the chunk size.
+    :param chunks: Iterable of raw DataFrames, e.g. from dataio.iter_dataset_chunks.
+    :return: Dictionary as returned by merge_partials.
+    """
+    return merge_partials(partial_aggregate(chunk) for chunk in chunks)
+
+
+class IncrementalFinanceState:
+    """
+    Running personal-finance aggregates that newly uploaded transactions are merged into.
+    Holds the per-(Category, Is_Income) sums, the end-of-day balance series and the balance tail,
+    so an update costs O(new rows) plus the size of those small summaries, never a full recompute.
+    """
+
+    def __init__(self, sums=None, daily_balance=None, ingested=None):
+        """
+        :param sums: Series of sums indexed by (Category, Is_Income), as from category_type_sums.
+        :param daily_balance: Series of end-of-day cumulative balances indexed by date.
+        :param ingested: Content hashes of the uploads already merged.
+        """
+        if sums is None:
+            index = pd.MultiIndex.from_arrays([[], np.array([], dtype=bool)], names=['Category', 'Is_Income'])
+            sums = pd.Series([], index=index, dtype='float64', name='Amount')
+        if daily_balance is None:
+            daily_balance = pd.Series([], index=pd.DatetimeIndex([], name='Date'), dtype='float64',
+                                      name='Cumulative Balance')
+        self.sums = sums
+        self.daily_balance = daily_balance
+        self.ingested = set(ingested or ())
+
+    @property
+    def balance(self):
+        """
+        Cumulative balance after the last merged transaction.
+        """
+        return float(self.daily_balance.iloc[-1]) if len(self.daily_balance) else 0.0
+
+    @property
+    def last_date(self):
+        """
+        Date of the last merged transaction, or None for an empty state.
+        """
+        return self.daily_balance.index[-1] if len(self.daily_balance) else None
+
+    def update(self, df, content_hash=None):
+        """
+        Merges new transactions into the running aggregates.
+        :param df: Cleaned DataFrame with Category, numeric Amount and datetime Date columns.
+        :param content_hash: Optional identifier of the upload; an already merged upload is skipped.
+        :return: True if the rows were merged, False if the upload was already ingested.
+        """
+        if content_hash is not None and content_hash in self.ingested:
+            return False
+        if df.empty:
+            if content_hash is not None:
+                self.ingested.add(content_hash)
+            return True
+
+        days = df['Date'].dt.normalize()
+        if self.last_date is not None and days.min() < self.last_date:
+            raise ValueError(
+                f"New transactions start on {days.min():%Y-%m-%d}, before the saved history ends "
+                f"({self.last_date:%Y-%m-%d}). Reset the history to re-ingest older data."
+            )
+
+        self.sums = self.sums.add(category_type_sums(df), fill_value=0.0).sort_index().rename('Amount')
+        daily = df['Amount'].groupby(days.rename('Date'), sort=True).sum().cumsum() + self.balance
+        # A day that continues the last saved day replaces its end-of-day balance
+        self.daily_balance = pd.concat([self.daily_balance[self.daily_balance.index < daily.index[0]], daily])
+        self.daily_balance.name = 'Cumulative Balance'
+        if content_hash is not None:
+            self.ingested.add(content_hash)
+        return True
+
+    def summary(self):
+        """
+        :return: Aggregates for all merged transactions, as returned by summarize_category_sums.
+        """
+        return summarize_category_sums(self.sums)
+
+    def to_dict(self):
+        """
+        :return: JSON-serializable representation of the state.
+        """
+        return {
+            'sums': [
+                [category, bool(is_income), float(amount)]
+                for (category, is_income), amount in self.sums.items()
+            ],
+            'daily_balance': [
+                [day.strftime('%Y-%m-%d'), float(balance)] for day, balance in self.daily_balance.items()
+            ],
+            'ingested': sorted(self.ingested),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        :param data: Dictionary produced by to_dict.
+        :return: IncrementalFinanceState instance.
+        """
+        state = cls(ingested=data.get('ingested'))
+        if data.get('sums'):
+            categories, flags, amounts = zip(*data['sums'])
+            index = pd.MultiIndex.from_arrays([list(categories), np.array(flags, dtype=bool)],
+                                              names=['Category', 'Is_Income'])
+            state.sums = pd.Series(amounts, index=index, dtype='float64', name='Amount')
+        if data.get('daily_balance'):
+            days, balances = zip(*data['daily_balance'])
+            state.daily_balance = pd.Series(balances, index=pd.DatetimeIndex(days, name='Date'),
+                                            dtype='float64', name='Cumulative Balance')
+        return state
+
+    def save(self, path):
+        """
+        Writes the state to a JSON file, replacing it atomically.
+        :param path: Destination file path.
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a saved state, or returns an empty one if the file does not exist.
+        :param path: File path written by save.
+        :return: IncrementalFinanceState instance.
+        """
+        try:
+            with open(path, encoding='utf-8') as file:
+                return cls.from_dict(json.load(file))
+        except FileNotFoundError:
+            return cls()
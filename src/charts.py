@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def minmax_downsample_indices(values, max_points):
+    """
+    Selects at most max_points positions of a series while keeping its peaks and troughs.
+    The series is split into equal buckets and the minimum and maximum of each bucket are kept,
+    together with the first and last points.
+    :param values: 1-D array-like of numbers, in plotting order.
+    :param max_points: Point budget; must be at least 4.
+    :return: Sorted NumPy array of selected positions.
+    """
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 4:
+        raise ValueError("max_points must be at least 4.")
+
+    buckets = (max_points - 2) // 2
+    starts = np.linspace(1, n - 1, buckets + 1).astype(np.int64)[:-1]
+    inner = values[1:n - 1]
+    offsets = starts - 1
+    bucket_of = np.repeat(np.arange(buckets), np.diff(np.append(offsets, n - 2)))
+
+    selected = [np.array([0, n - 1])]
+    for reduce in (np.minimum, np.maximum):
+        extremes = reduce.reduceat(inner, offsets)
+        hits = np.flatnonzero(inner == extremes[bucket_of])
+        # First hit per bucket; every bucket has at least one
+        _, first = np.unique(bucket_of[hits], return_index=True)
+        selected.append(hits[first] + 1)
+    return np.unique(np.concatenate(selected))
+
+
+def downsample_frame(df, y, max_points):
+    """
+    Downsamples an already ordered frame for line plotting with minmax_downsample_indices.
+    :param df: DataFrame sorted along the x axis.
+    :param y: Column whose peaks and troughs must be preserved.
+    :param max_points: Point budget; frames within it are returned unchanged.
+    :return: DataFrame with at most max_points rows.
+    """
+    if max_points is None or len(df) <= max_points:
+        return df
+    return df.iloc[minmax_downsample_indices(df[y].to_numpy(), max_points)]
@@ -0,0 +1,149 @@
+import pandas as pd
+
+# Candidate date formats, tried in order; ISO layouts first so they take the strict C fast path
+DATE_FORMATS = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', 'ISO8601',
+    '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', '%d.%m.%Y', '%d-%m-%Y', '%m/%d/%y', '%d/%m/%y',
+]
+
+# Number of distinct values inspected when detecting a format
+_DETECTION_SAMPLE = 1000
+
+def _parse_with(values, date_format):
+    """
+    Parses values with one explicit format, leaving mismatches as NaT.
+    """
+    return pd.to_datetime(values, format=date_format, errors='coerce')
+
+
+def detect_date_format(values):
+    """
+    Picks the first candidate format that parses the most values of a sample.
+    Every call tries the full DATE_FORMATS list, so the result depends only on values; the
+    search stops at the first format that parses the whole sample.
+    :param values: Array-like of date strings, ideally already de-duplicated.
+    :return: Format string from DATE_FORMATS, or None if no candidate parses any value.
+    """
+    sample = pd.Index(values).dropna()[:_DETECTION_SAMPLE]
+    if not len(sample):
+        return None
+
+    best, best_count = None, 0
+    for date_format in DATE_FORMATS:
+        count = int(_parse_with(sample, date_format).notna().sum())
+        if count > best_count:
+            best, best_count = date_format, count
+        if count == len(sample):
+            break
+    return best
+
+
+def parse_dates(values, date_format=None):
+    """
+    Converts a column of dates to datetimes; invalid or missing values become NaT.
+    Each distinct value is parsed once, with an explicit format detected from the data unless
+    one is given, and the results are mapped back onto the rows. Ledgers repeat the same dates
+    many times, so this is much cheaper than parsing every row with format inference.
+    Columns that are already datetimes are returned unchanged.
+    :param values: Series of date strings or datetimes.
+    :param date_format: Optional strptime format, 'ISO8601' or 'mixed'; detected when omitted.
+    :return: Datetime Series with the same index and name.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if not (values.dtype == object or pd.api.types.is_string_dtype(values)):
+        return pd.to_datetime(values, errors='coerce')
+
+    codes, uniques = pd.factorize(values)
+    if date_format is None:
+        date_format = detect_date_format(uniques)
+    parsed = _parse_with(uniques, date_format) if date_format else pd.to_datetime(uniques, errors='coerce')
+    return pd.Series(
+        pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT),
+        index=values.index, name=values.name,
+    )
+
+
+def enable_copy_on_write():
+    """
+    Turns on pandas Copy-on-Write, so frames derived with assign, column selection or row filters
+    share column data with their source until one of them is written. It is always on from pandas 3.
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def clean_transactions(df):
+    """
+    Parses the Date and Amount columns of personal finance transactions and drops invalid rows.
+    The input frame is left untouched; the result holds new Date and Amount columns and shares
+    the other columns with it under Copy-on-Write.
+    :param df: DataFrame with Category, Amount and Date columns.
+    :return: Tuple of (cleaned DataFrame, rows dropped for invalid dates, rows dropped for invalid amounts).
+    """
+    dates = parse_dates(df['Date'])
+    amounts = pd.to_numeric(df['Amount'], errors='coerce')
+
+    # Rows with invalid dates are dropped first, so invalid amounts are only counted on the rest
+    valid_dates = dates.notna().to_numpy()
+    valid_amounts = amounts.notna().to_numpy()
+    invalid_dates = int((~valid_dates).sum())
+    invalid_amounts = int((valid_dates & ~valid_amounts).sum())
+
+    df = df.assign(Date=dates, Amount=amounts)
+    if invalid_dates or invalid_amounts:
+        df = df[valid_dates & valid_amounts]
+
+    return df, invalid_dates, invalid_amounts
+
+
+def clean_holdings(df):
+    """
+    Parses the dates and numeric columns of investment holdings and drops rows with any invalid value.
+    The input frame is left untouched.
+    :param df: DataFrame with the investment portfolio columns.
+    :return: Tuple of (cleaned DataFrame, number of rows removed).
+    """
+    numeric_columns = ['Purchase_Price', 'Current_Value', 'Annual_Return']
+    df = df.assign(
+        Purchase_Date=parse_dates(df['Purchase_Date']),
+        **{col: pd.to_numeric(df[col], errors='coerce') for col in numeric_columns},
+    )
+
+    # Rows with any invalid value are removed with one boolean filter, skipped when all rows are valid
+    valid = df.notna().all(axis=1).to_numpy()
+    removed = int((~valid).sum())
+    if removed:
+        df = df[valid]
+    return df, removed
+
+
+# Text columns become categoricals when at most this share of their values is distinct
+CATEGORY_MAX_RATIO = 0.5
+
+
+def frame_memory(df):
+    """
+    :param df: DataFrame.
+    :return: Memory used by the frame in bytes, including the contents of string columns.
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+
+def compact_dtypes(df, max_category_ratio=CATEGORY_MAX_RATIO):
+    """
+    Converts a cleaned frame to a compact schema.
+    Only low-cardinality text columns become categoricals. Numeric columns keep int64 and float64:
+    they are measures that later get multiplied and summed, which would silently wrap around in
+    narrow integer types, and amounts do not survive float32 exactly.
+    :param df: Cleaned DataFrame.
+    :param max_category_ratio: Largest distinct-to-total ratio for which text becomes categorical.
+    :return: DataFrame with the compact dtypes.
+    """
+    columns = {}
+    for name in df.columns:
+        values = df[name]
+        if values.dtype == object or pd.api.types.is_string_dtype(values):
+            if values.nunique(dropna=True) <= max(1, len(values) * max_category_ratio):
+                columns[name] = values.astype('category')
+    return df.assign(**columns) if columns else df
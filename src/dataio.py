@@ -0,0 +1,318 @@
+import csv
+import gzip
+import hashlib
+import io
+import os
+
+# pandas and pyarrow are imported inside the readers that need them
+
+# Leading bytes of each supported container, checked in order
+_MAGIC_NUMBERS = [
+    (b'PAR1', 'parquet'),
+    (b'ARROW1', 'arrow'),
+    (b'\xff\xff\xff\xff', 'arrow_stream'),
+    (b'\x1f\x8b', 'csv.gz'),
+    (b'\x28\xb5\x2f\xfd', 'csv.zst'),
+]
+
+SUPPORTED_EXTENSIONS = ["csv", "gz", "zst", "parquet", "feather", "arrow"]
+
+
+def _read_head(source, size=8):
+    """
+    Reads the first bytes of a path, bytes object or seekable binary file without consuming it.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:size])
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            return file.read(size)
+    position = source.tell()
+    head = source.read(size)
+    source.seek(position)
+    return head
+
+
+def _as_binary(source):
+    """
+    Returns a binary file-like object or path usable by pandas and pyarrow.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+class _Borrowed(io.BufferedIOBase):
+    """
+    Read-only view of a caller's binary file that leaves it open when the view is closed.
+    """
+
+    def __init__(self, file):
+        super().__init__()
+        self._file = file
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def read1(self, size=-1):
+        return self._file.read(size)
+
+
+def file_digest(source, block_size=1024 * 1024):
+    """
+    SHA-256 digest of a dataset's raw bytes, read block by block so large files are never held whole.
+    :param source: Path, bytes or seekable binary file; a file's position is restored afterwards.
+    :param block_size: Number of bytes hashed per read.
+    :return: Hex digest string.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            while block := file.read(block_size):
+                digest.update(block)
+        return digest.hexdigest()
+    position = source.tell()
+    source.seek(0)
+    while block := source.read(block_size):
+        digest.update(block)
+    source.seek(position)
+    return digest.hexdigest()
+
+
+def detect_format(source):
+    """
+    Detects the container format of a dataset from its leading bytes.
+    :param source: Path, bytes or seekable binary file.
+    :return: One of 'parquet', 'arrow', 'arrow_stream', 'csv.gz', 'csv.zst' or 'csv'.
+    """
+    head = _read_head(source)
+    for magic, file_format in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return file_format
+    return 'csv'
+
+
+def open_text(source, encoding='utf-8'):
+    """
+    Opens a plain, gzip- or zstd-compressed CSV source as a text stream.
+    :param source: Path, bytes or seekable binary file.
+    :param encoding: Text encoding of the decompressed data.
+    :return: Text file object; the caller is responsible for closing it.
+    """
+    file_format = detect_format(source)
+    if file_format not in ('csv', 'csv.gz', 'csv.zst'):
+        raise ValueError(f"Expected a CSV file but found {file_format} data.")
+
+    binary = _as_binary(source)
+    if not isinstance(binary, (str, os.PathLike)):
+        # Closing the text stream must not close an uploaded file the caller still holds
+        binary = _Borrowed(binary)
+    if file_format == 'csv.gz':
+        binary = gzip.open(binary, 'rb')
+    elif file_format == 'csv.zst':
+        import pyarrow as pa
+        binary = pa.input_stream(binary, compression='zstd')
+    elif isinstance(binary, (str, os.PathLike)):
+        binary = open(binary, 'rb')
+    return io.TextIOWrapper(binary, encoding=encoding, newline='')
+
+
+def _arrow_schema_names(source, file_format):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if file_format == 'parquet':
+        return pq.ParquetFile(source).schema_arrow.names
+    if file_format == 'arrow_stream':
+        return pa.ipc.open_stream(source).schema.names
+    return pa.ipc.open_file(source).schema.names
+
+
+def read_dataset(source, columns=None):
+    """
+    Reads a CSV (optionally gzip/zstd compressed), Parquet or Feather/Arrow IPC dataset into a DataFrame.
+    :param source: Path, bytes or seekable binary file; the format is detected from its contents.
+    :param columns: Optional list of columns to read; other columns are never parsed.
+        Requested columns missing from the file are skipped so validation can report them.
+    :return: DataFrame with the projected columns.
+    """
+    import pandas as pd
+
+    file_format = detect_format(source)
+    if file_format.startswith('csv'):
+        wanted = set(columns) if columns is not None else None
+        with open_text(source) as text:
+            return pd.read_csv(text, usecols=(lambda name: name in wanted) if wanted is not None else None)
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    binary = _as_binary(source)
+    if columns is not None:
+        available = _arrow_schema_names(binary, file_format)
+        if not isinstance(binary, (str, os.PathLike)):
+            binary.seek(0)
+        columns = [name for name in columns if name in available]
+
+    if file_format == 'parquet':
+        return pd.read_parquet(binary, columns=columns)
+    if file_format == 'arrow_stream':
+        table = pa.ipc.open_stream(binary).read_all()
+        return (table.select(columns) if columns is not None else table).to_pandas()
+    return feather.read_table(binary, columns=columns).to_pandas()
+
+
+def count_batches(source):
+    """
+    Number of independently readable parts of a columnar dataset.
+    :param source: Path, bytes or seekable binary file.
+    :return: Row groups of a Parquet file or record batches of an Arrow IPC file; None for CSV
+        and Arrow streams, which can only be read from the start.
+    """
+    file_format = detect_format(source)
+    if file_format not in ('parquet', 'arrow'):
+        return None
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    binary = _as_binary(source)
+    if file_format == 'parquet':
+        return pq.ParquetFile(binary).num_row_groups
+    return pa.ipc.open_file(binary).num_record_batches
+
+
+def iter_dataset_chunks(source, columns=None, chunksize=500000, batches=None):
+    """
+    Lazily yields a dataset as DataFrames of at most chunksize rows, so it never has to fit in memory.
+    :param source: Path, bytes or seekable binary file; the format is detected from its contents.
+    :param columns: Optional list of columns to read; missing ones are skipped as in read_dataset.
+    :param chunksize: Maximum number of rows per chunk.
+    :param batches: Optional indices of the Parquet row groups or Arrow IPC file record batches to
+        read, see count_batches; all of them by default.
+    :return: Generator of DataFrames.
+    """
+    import pandas as pd
+
+    file_format = detect_format(source)
+    if batches is not None and file_format not in ('parquet', 'arrow'):
+        raise ValueError(f"Cannot select batches of {file_format} data.")
+    if file_format.startswith('csv'):
+        wanted = set(columns) if columns is not None else None
+        with open_text(source) as text:
+            reader = pd.read_csv(
+                text, chunksize=chunksize,
+                usecols=(lambda name: name in wanted) if wanted is not None else None,
+            )
+            with reader:
+                yield from reader
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    binary = _as_binary(source)
+    if columns is not None:
+        available = _arrow_schema_names(binary, file_format)
+        if not isinstance(binary, (str, os.PathLike)):
+            binary.seek(0)
+        columns = [name for name in columns if name in available]
+
+    if file_format == 'parquet':
+        record_batches = pq.ParquetFile(binary).iter_batches(
+            batch_size=chunksize, columns=columns, row_groups=batches
+        )
+    elif file_format == 'arrow_stream':
+        record_batches = pa.ipc.open_stream(binary)
+    else:
+        reader = pa.ipc.open_file(binary)
+        indices = range(reader.num_record_batches) if batches is None else batches
+        record_batches = (reader.get_batch(i) for i in indices)
+
+    for batch in record_batches:
+        if columns is not None and file_format != 'parquet':
+            batch = batch.select(columns)
+        # Arrow IPC batches can exceed chunksize; slicing is zero-copy
+        for offset in range(0, batch.num_rows, chunksize):
+            yield batch.slice(offset, chunksize).to_pandas()
+
+
+def iter_dataset_rows(source, columns=None, batch_size=10000):
+    """
+    Lazily yields the rows of any supported dataset as dictionaries, one record batch at a time.
+    CSV values are yielded as strings, as csv.DictReader does.
+    :param source: Path, bytes or seekable binary file.
+    :param columns: Optional list of columns to read.
+    :param batch_size: Number of rows decoded per batch for columnar formats.
+    :return: Generator of row dictionaries.
+    """
+    file_format = detect_format(source)
+    if file_format.startswith('csv'):
+        with open_text(source) as text:
+            for row in csv.DictReader(text):
+                yield {name: row.get(name) for name in columns} if columns is not None else row
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    binary = _as_binary(source)
+    if file_format == 'parquet':
+        batches = pq.ParquetFile(binary).iter_batches(batch_size=batch_size, columns=columns)
+    elif file_format == 'arrow_stream':
+        batches = pa.ipc.open_stream(binary)
+    else:
+        reader = pa.ipc.open_file(binary)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+
+    for batch in batches:
+        if columns is not None and file_format != 'parquet':
+            batch = batch.select(columns)
+        yield from batch.to_pylist()
+
+
+# Download formats offered for cleaned data: label -> (format, file name, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ('csv', 'cleaned_data.csv', 'text/csv'),
+    "Compressed CSV (gzip)": ('csv.gz', 'cleaned_data.csv.gz', 'application/gzip'),
+    "Parquet": ('parquet', 'cleaned_data.parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def iter_csv_chunks(df, chunk_size=100000):
+    """
+    Serializes a frame to CSV one block of rows at a time.
+    :param df: DataFrame to export.
+    :param chunk_size: Number of rows encoded per chunk.
+    :return: Generator of UTF-8 encoded CSV chunks; the first one carries the header.
+    """
+    for start in range(0, max(len(df), 1), chunk_size):
+        yield df.iloc[start:start + chunk_size].to_csv(index=False, header=start == 0).encode('utf-8')
+
+
+def export_dataset(df, file_format='csv', chunk_size=100000):
+    """
+    Exports a frame as CSV, gzip-compressed CSV or Parquet.
+    CSV output is written in chunks, so no full-size intermediate string is built.
+    :param df: DataFrame to export.
+    :param file_format: One of 'csv', 'csv.gz' or 'parquet'.
+    :param chunk_size: Number of rows encoded per CSV chunk.
+    :return: Exported file contents as bytes.
+    """
+    buffer = io.BytesIO()
+    if file_format == 'parquet':
+        df.to_parquet(buffer, index=False)
+    elif file_format in ('csv', 'csv.gz'):
+        sink = gzip.GzipFile(fileobj=buffer, mode='wb') if file_format == 'csv.gz' else buffer
+        for chunk in iter_csv_chunks(df, chunk_size):
+            sink.write(chunk)
+        if sink is not buffer:
+            sink.close()
+    else:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    return buffer.getvalue()
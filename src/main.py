@@ -1,18 +1,67 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
+import hashlib
 import sys
 import os
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from API import generate_report, calculate_metrics
+from src.aggregation import IncrementalFinanceState, aggregate_transactions
+from src.charts import downsample_frame
+from src.cleaning import (
+    clean_holdings, clean_transactions, compact_dtypes, enable_copy_on_write, frame_memory, parse_dates
+)
+from src.dataio import EXPORT_FORMATS, SUPPORTED_EXTENSIONS, export_dataset, file_digest, read_dataset
+from src.parallel import aggregate_sources
+from src.portfolio import annualized_returns, portfolio_xirr, summarize_type_sums, type_sums
+from src.prices import load_price_history, portfolio_time_series, time_weighted_return
+from src.store import DatasetStore
+
+# Analysis derives new frames instead of writing into cached ones; Copy-on-Write keeps that copy-free
+enable_copy_on_write()
+
+# Maximum number of points sent to the browser for the balance trend line
+BALANCE_TREND_MAX_POINTS = int(os.getenv('BALANCE_TREND_MAX_POINTS', 2000))
+
+# Above this many marks figures switch to WebGL traces or per-type aggregates
+WEBGL_ROW_THRESHOLD = int(os.getenv('WEBGL_ROW_THRESHOLD', 5000))
+
+# Saved personal finance histories that new uploads are merged into, one file per owner
+FINANCE_STATE_DIR = os.getenv('FINANCE_STATE_DIR', '.finance_state')
+
+# Local store that keeps ingested uploads between sessions
+DATASET_STORE_PATH = os.getenv('DATASET_STORE_PATH', '.datasets.sqlite')
+
+# Rows parsed and cleaned at a time in large file mode
+LARGE_FILE_CHUNK_ROWS = int(os.getenv('LARGE_FILE_CHUNK_ROWS', 500000))
+
+# Server directory whose files large file mode can read from disk, for files too big to upload
+LARGE_FILE_DIR = os.getenv('LARGE_FILE_DIR')
+
+# Worker processes used in large file mode; 1 streams chunks in the app process
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', os.cpu_count() or 1))
+
+# Memory-mapped price matrices of uploaded price histories, one per file
+PRICE_CACHE_DIR = os.getenv('PRICE_CACHE_DIR', '.price_cache')
+
+# Rows per page of the Raw Data view; only the visible page is sent to the browser
+RAW_DATA_PAGE_SIZE = 100
 
 def validate_csv_structure(df):
     """
     Validates the CSV structure and returns error messages if any
     """
+    errors, file_type, _ = validate_and_parse_csv(df)
+    return errors, file_type
+
+def validate_and_parse_csv(df):
+    """
+    Validates the CSV structure like validate_csv_structure and also returns the frame, with the
+    Date column of personal finance data already parsed so cleaning does not parse it again
+    Returns the errors, the detected file type and the frame; the input frame is not modified
+    """
     errors = []
     
     # Check required columns
@@ -28,57 +77,63 @@ def validate_csv_structure(df):
         file_type = 'Personal Finance'
     else:
         errors.append("Unable to determine file type. Missing required columns.")
-        return errors, None
+        return errors, None, df
     
     # Validate data types
     if file_type == 'Personal Finance':
-        # Check Date format
-        try:
-            pd.to_datetime(df['Date'])
-        except:
+        # Check Date format; the parsed column is returned so cleaning does not parse it again
+        dates = parse_dates(df['Date'])
+        if dates.isna().sum() > df['Date'].isna().sum():
             errors.append("Date column contains invalid dates")
+        df = df.assign(Date=dates)
             
         # Check Amount format
         if not pd.to_numeric(df['Amount'], errors='coerce').notna().all():
             errors.append("Amount column contains non-numeric values")
             
-    return errors, file_type
+    return errors, file_type, df
 
-def analyze_personal_finance(df):
+def filter_frame(df, date_column, start=None, end=None, column=None, values=None):
+    """
+    In-memory counterpart of the dataset store filters: inclusive date range and value membership
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= (df[date_column] >= pd.Timestamp(start)).to_numpy()
+    if end is not None:
+        mask &= (df[date_column] <= pd.Timestamp(end)).to_numpy()
+    if values is not None:
+        mask &= df[column].isin(list(values)).to_numpy()
+    return df if mask.all() else df[mask]
+
+def analyze_personal_finance(df, store=None, dataset_id=None, start=None, end=None, categories=None):
     """
     Analyze personal finance data with income and expenses
+    With a DatasetStore, filters and aggregation run in SQL against the stored dataset instead of df
     """
-    # Separate income and expenses
-    df['Type'] = df['Amount'].apply(lambda x: 'Income' if x > 0 else 'Expense')
-    
-    # Calculate totals
-    total_income = df[df['Amount'] > 0]['Amount'].sum()
-    total_expenses = abs(df[df['Amount'] < 0]['Amount'].sum())
-    net_savings = total_income - total_expenses
+    if store is not None:
+        return store.personal_finance_summary(dataset_id, start=start, end=end, categories=categories)
     
-    # Category analysis
-    category_summary = df.groupby(['Category', 'Type'])['Amount'].sum().reset_index()
-    
-    return {
-        'total_income': total_income,
-        'total_expenses': total_expenses,
-        'net_savings': net_savings,
-        'category_summary': category_summary
-    }
+    # One grouped pass yields the totals, the category/type summary and the per-category totals
+    return aggregate_transactions(filter_frame(df, 'Date', start, end, 'Category', categories))
 
-def create_visualizations(df):
+def create_visualizations(df, analysis=None, max_points=BALANCE_TREND_MAX_POINTS,
+                          webgl_threshold=WEBGL_ROW_THRESHOLD, balance_trend=None):
     """
     Create visualizations for personal finance data
+    Line traces built from more than webgl_threshold rows are rendered with WebGL (Scattergl),
+    decided on the row count before downsampling.
+    balance_trend optionally supplies precomputed Date / Cumulative Balance points, e.g. from the saved history.
     """
+    import plotly.express as px
+
+    if analysis is None:
+        analysis = aggregate_transactions(df)
     figures = []
     
     # Income vs Expenses Pie Chart
-    income_df = df[df['Amount'] > 0]
-    expense_df = df[df['Amount'] < 0].copy()
-    expense_df['Amount'] = abs(expense_df['Amount'])
-    
     fig1 = px.pie(
-        values=[income_df['Amount'].sum(), expense_df['Amount'].sum()],
+        values=[analysis['total_income'], analysis['total_expenses']],
         names=['Income', 'Expenses'],
         title='Income vs Expenses Distribution'
     )
@@ -86,7 +141,7 @@ def create_visualizations(df):
     
     # Category breakdown
     fig2 = px.bar(
-        df.groupby('Category')['Amount'].sum().sort_values().reset_index(),
+        analysis['category_totals'].sort_values().reset_index(),
         x='Amount',
         y='Category',
         title='Cash Flow by Category',
@@ -94,15 +149,18 @@ def create_visualizations(df):
     )
     figures.append(fig2)
     
-    # Daily balance trend
-    df_sorted = df.sort_values('Date')
-    df_sorted['Cumulative Balance'] = df_sorted['Amount'].cumsum()
+    # Daily balance trend, downsampled to the point budget while keeping peaks and troughs
+    if balance_trend is None:
+        balance_trend = df[['Date', 'Amount']].sort_values('Date')
+        balance_trend = balance_trend.assign(**{'Cumulative Balance': balance_trend['Amount'].cumsum()})
     
+    trend = downsample_frame(balance_trend, 'Cumulative Balance', max_points)
     fig3 = px.line(
-        df_sorted,
+        trend,
         x='Date',
         y='Cumulative Balance',
-        title='Balance Trend Over Time'
+        title='Balance Trend Over Time',
+        render_mode='webgl' if len(balance_trend) > webgl_threshold else 'svg'
     )
     figures.append(fig3)
     
@@ -122,38 +180,66 @@ def generate_ai_analysis(data):
     
     return generate_report({"prompt": prompt})
 
-def analyze_investment_portfolio(df):
+def analyze_investment_portfolio(df, store=None, dataset_id=None, start=None, end=None, types=None, as_of=None):
     """
     Analyze investment portfolio data
+    With a DatasetStore, filters and aggregation run in SQL against the stored dataset instead of df
+    Returns are measured from each Purchase_Date to as_of, the date of Current_Value (default today)
     """
-    df['Gain_Loss'] = df['Current_Value'] - df['Purchase_Price']
-    df['Return_Percentage'] = (df['Gain_Loss'] / df['Purchase_Price']) * 100
+    if store is not None:
+        return store.portfolio_summary(dataset_id, start=start, end=end, types=types, as_of=as_of)
     
-    total_investment = df['Purchase_Price'].sum()
-    current_value = df['Current_Value'].sum()
-    total_gain_loss = current_value - total_investment
-    avg_return = df['Annual_Return'].mean()
-    
-    # Asset type distribution
-    type_distribution = df.groupby('Type')['Current_Value'].sum()
+    # Derived per-holding values are returned, not written into the (possibly cached) input frame
+    df = filter_frame(df, 'Purchase_Date', start, end, 'Type', types)
+    gain_loss = (df['Current_Value'] - df['Purchase_Price']).rename('Gain_Loss')
+    return_percentage = (gain_loss / df['Purchase_Price'] * 100).rename('Return_Percentage')
+    annualized_return = annualized_returns(df['Purchase_Price'], df['Current_Value'], df['Purchase_Date'], as_of)
     
+    # Totals, type distribution and the weighted returns all come from one grouped pass
     return {
-        'total_investment': total_investment,
-        'current_value': current_value,
-        'total_gain_loss': total_gain_loss,
-        'avg_return': avg_return,
-        'type_distribution': type_distribution
+        **summarize_type_sums(type_sums(df)),
+        'gain_loss': gain_loss,
+        'return_percentage': return_percentage,
+        'annualized_return': annualized_return,
+        'xirr': portfolio_xirr(df['Purchase_Price'], df['Current_Value'], df['Purchase_Date'], as_of)
     }
 
-def create_investment_visualizations(df):
+def create_investment_visualizations(df, analysis=None, webgl_threshold=WEBGL_ROW_THRESHOLD):
     """
     Create visualizations for investment portfolio
+    The per-lot gain/loss and annualized returns of analyze_investment_portfolio are reused when given,
+    otherwise they are derived from df; no columns are added to df
+    Portfolios with more than webgl_threshold holdings get per-type bars instead of per-asset marks.
     """
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    analysis = analysis or {}
+    gain_loss = analysis.get('gain_loss')
+    if gain_loss is None:
+        gain_loss = df['Gain_Loss'] if 'Gain_Loss' in df.columns else df['Current_Value'] - df['Purchase_Price']
+    annualized_return = analysis.get('annualized_return')
+    if annualized_return is None and 'Purchase_Date' in df.columns:
+        annualized_return = annualized_returns(df['Purchase_Price'], df['Current_Value'], df['Purchase_Date'])
     figures = []
+    aggregate = len(df) > webgl_threshold
+    measures = {
+        'Current_Value': df['Current_Value'],
+        'Annual_Return': df['Annual_Return'],
+        'Gain_Loss': gain_loss.rename('Gain_Loss'),
+    }
+    if annualized_return is not None:
+        measures['Annualized_Return'] = annualized_return.rename('Annualized_Return')
+    by_type = pd.DataFrame(measures, copy=False).groupby(df['Type'], sort=True, observed=True).agg(
+        Current_Value=('Current_Value', 'sum'),
+        Annual_Return=('Annual_Return', 'mean'),
+        Gain_Loss=('Gain_Loss', 'sum'),
+        **({'Annualized_Return': ('Annualized_Return', 'mean')} if annualized_return is not None else {}),
+    ).reset_index()
     
-    # Asset Type Distribution Pie Chart
+    # Asset Type Distribution Pie Chart, pre-aggregated so only one slice per type is sent
     fig1 = px.pie(
-        df,
+        by_type,
         values='Current_Value',
         names='Type',
         title='Portfolio Distribution by Asset Type'
@@ -161,74 +247,314 @@ def create_investment_visualizations(df):
     figures.append(fig1)
     
     # Returns by Asset Bar Chart
-    fig2 = px.bar(
-        df,
-        x='Asset',
-        y='Annual_Return',
-        color='Type',
-        title='Annual Returns by Asset'
-    )
+    if aggregate:
+        fig2 = px.bar(
+            by_type,
+            x='Type',
+            y='Annual_Return',
+            color='Type',
+            title='Average Annual Return by Asset Type'
+        )
+    else:
+        fig2 = px.bar(
+            df,
+            x='Asset',
+            y='Annual_Return',
+            color='Type',
+            title='Annual Returns by Asset'
+        )
     figures.append(fig2)
     
+    # Annualized returns measured from the purchase dates; lots held under a year have none
+    if annualized_return is not None:
+        if aggregate:
+            fig3 = px.bar(
+                by_type,
+                x='Type',
+                y='Annualized_Return',
+                color='Type',
+                title='Average Annualized Return since Purchase by Asset Type (%)'
+            )
+        else:
+            fig3 = px.bar(
+                x=df['Asset'],
+                y=annualized_return,
+                color=df['Type'],
+                labels={'x': 'Asset', 'y': 'Annualized_Return', 'color': 'Type'},
+                title='Annualized Return since Purchase by Asset (%)'
+            )
+        figures.append(fig3)
+    
     # Gain/Loss Waterfall
-    fig3 = go.Figure(go.Waterfall(
+    if aggregate:
+        assets, gains = by_type['Type'], by_type['Gain_Loss']
+    else:
+        assets, gains = df['Asset'], gain_loss
+    fig4 = go.Figure(go.Waterfall(
         name="Portfolio",
         orientation="v",
-        measure=["relative"] * len(df),
-        x=df['Asset'],
-        y=df['Gain_Loss'],
-        text=df['Gain_Loss'].round(2),
+        measure=["relative"] * len(gains),
+        x=assets,
+        y=gains,
+        text=gains.round(2),
         connector={"line": {"color": "rgb(63, 63, 63)"}},
     ))
-    fig3.update_layout(title="Gain/Loss by Asset")
-    figures.append(fig3)
+    fig4.update_layout(title="Gain/Loss by Asset Type" if aggregate else "Gain/Loss by Asset")
+    figures.append(fig4)
     
     return figures
 
+@st.cache_resource(max_entries=4, show_spinner="Loading price history...")
+def get_price_history(content_hash, _raw):
+    """
+    Price matrix of an uploaded price history (an upload, a path or bytes), shared across sessions
+    The closes are memory-mapped from the on-disk cache, so a file seen before opens without parsing
+    """
+    return load_price_history(_raw, PRICE_CACHE_DIR, content_hash=content_hash)
+
+def create_price_history_visualizations(series, max_points=BALANCE_TREND_MAX_POINTS,
+                                        webgl_threshold=WEBGL_ROW_THRESHOLD):
+    """
+    Create value, drawdown, rolling volatility and time-weighted return charts from portfolio_time_series output
+    """
+    import plotly.express as px
+
+    figures = []
+    for column, title in (
+        ('Value', 'Portfolio Value Over Time'),
+        ('Drawdown', 'Drawdown from Peak (%)'),
+        ('Volatility', 'Rolling Annualized Volatility (%)'),
+        ('Cumulative_Return', 'Time-Weighted Cumulative Return (%)'),
+    ):
+        points = series.dropna(subset=[column])
+        figures.append(px.line(
+            downsample_frame(points, column, max_points),
+            x='Date',
+            y=column,
+            title=title,
+            render_mode='webgl' if len(points) > webgl_threshold else 'svg'
+        ))
+    return figures
+
+@st.cache_resource(max_entries=4, show_spinner="Building portfolio history...")
+def get_portfolio_history(price_hash, holdings_hash, _price_file, _holdings):
+    """
+    Portfolio value history of a holdings upload over a price history, memoized on both content hashes
+    The price file and the cleaned holdings are excluded from argument hashing and only read on a cache miss
+    Returns the number of skipped lots, the cumulative and annualized time-weighted return and the figures
+    """
+    prices = get_price_history(price_hash, _price_file)
+    series, skipped = portfolio_time_series(_holdings, prices)
+    return skipped, time_weighted_return(series), create_price_history_visualizations(series)
+
+def format_percent(value):
+    """
+    Percentage with two decimals, or n/a when the value is undefined, e.g. an XIRR without a sign change
+    """
+    return "n/a" if pd.isna(value) else f"{value:.2f}%"
+
+def format_bytes(size):
+    """
+    Human-readable size, e.g. 1.5 MB
+    """
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
 def clean_and_validate_data(df, analysis_type):
     """
     Clean and validate data based on analysis type
     """
     try:
         if analysis_type == "Personal Finance":
-            # Clean Date column
-            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-            
-            # Check for and remove rows with invalid dates
-            invalid_dates = df['Date'].isna()
-            if invalid_dates.any():
-                st.warning(f"Found {invalid_dates.sum()} rows with invalid dates. These rows will be excluded.")
-                df = df.dropna(subset=['Date'])
-            
-            # Clean Amount column
-            df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
-            
-            # Check for and remove rows with invalid amounts
-            invalid_amounts = df['Amount'].isna()
-            if invalid_amounts.any():
-                st.warning(f"Found {invalid_amounts.sum()} rows with invalid amounts. These rows will be excluded.")
-                df = df.dropna(subset=['Amount'])
+            df, invalid_dates, invalid_amounts = clean_transactions(df)
+            if invalid_dates:
+                st.warning(f"Found {invalid_dates} rows with invalid dates. These rows will be excluded.")
+            if invalid_amounts:
+                st.warning(f"Found {invalid_amounts} rows with invalid amounts. These rows will be excluded.")
             
         elif analysis_type == "Investment Portfolio":
-            # Clean Purchase_Date
-            df['Purchase_Date'] = pd.to_datetime(df['Purchase_Date'], errors='coerce')
-            
-            # Clean numeric columns
-            numeric_columns = ['Purchase_Price', 'Current_Value', 'Annual_Return']
-            for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Remove rows with any invalid data
-            initial_rows = len(df)
-            df = df.dropna()
-            if len(df) < initial_rows:
-                st.warning(f"Removed {initial_rows - len(df)} rows with invalid data.")
+            df, removed = clean_holdings(df)
+            if removed:
+                st.warning(f"Removed {removed} rows with invalid data.")
+        
+        # Categorical text keeps large ledgers small and speeds up grouping
+        memory_before = frame_memory(df)
+        df = compact_dtypes(df)
+        st.caption(f"Cleaned data uses {format_bytes(memory_before)} before and "
+                   f"{format_bytes(frame_memory(df))} after dtype compaction")
         
         return df
     
     except Exception as e:
         raise ValueError(f"Error cleaning data: {str(e)}")
 
+# Only these columns are read from uploads, so wide exports are projected at parse time
+ANALYSIS_COLUMNS = {
+    "Profit & Loss Statement": ['metric', 'amount_month_usd'],
+    "Personal Finance": ['Category', 'Amount', 'Date'],
+    "Investment Portfolio": ['Asset', 'Type', 'Purchase_Date', 'Purchase_Price', 'Current_Value', 'Annual_Return'],
+}
+
+def page_frame(df, page, page_size, sort_by=None, ascending=True, search=None):
+    """
+    Filter, sort and slice a frame on the server so only one page is rendered
+    Pages past the end are clamped to the last page
+    Returns the page of rows, the 1-based page number used and the number of matching rows
+    """
+    if search:
+        text_columns = df.select_dtypes(include=['object', 'string', 'category']).columns
+        matches = np.zeros(len(df), dtype=bool)
+        for col in text_columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Match each category once and look the rows up by code
+                hits = values.cat.categories.astype(str).str.contains(search, case=False, regex=False)
+                matches |= np.isin(values.cat.codes.to_numpy(), np.flatnonzero(hits))
+            else:
+                matches |= values.astype(str).str.contains(search, case=False, regex=False).to_numpy()
+        df = df[matches]
+    
+    total_pages = max(1, -(-len(df) // page_size))
+    page = min(max(1, page), total_pages)
+    if sort_by:
+        df = df.sort_values(sort_by, ascending=ascending, kind='stable')
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size], page, len(df)
+
+def render_raw_data(df, page_size=RAW_DATA_PAGE_SIZE):
+    """
+    Paginated Raw Data view with server-side filtering and sorting
+    """
+    search_col, sort_col, order_col, page_col = st.columns([3, 2, 1, 1])
+    search = search_col.text_input("Filter rows", key="raw_data_search")
+    sort_by = sort_col.selectbox("Sort by", ["(original order)"] + list(df.columns), key="raw_data_sort")
+    ascending = order_col.selectbox("Order", ["Ascending", "Descending"], key="raw_data_order") == "Ascending"
+    page = page_col.number_input("Page", min_value=1, step=1, key="raw_data_page")
+    
+    view, page, matching = page_frame(
+        df, page, page_size,
+        sort_by=None if sort_by == "(original order)" else sort_by,
+        ascending=ascending,
+        search=search
+    )
+    st.dataframe(view)
+    first_row = (page - 1) * page_size
+    st.caption(
+        f"Rows {first_row + 1 if len(view) else 0:,}-{first_row + len(view):,} of {matching:,} "
+        f"(page {page} of {max(1, -(-matching // page_size))})"
+    )
+
+def history_path(owner, directory=FINANCE_STATE_DIR):
+    """
+    File of the saved history belonging to owner, e.g. the signed-in user's email or a history name
+    """
+    return os.path.join(directory, hashlib.sha256(owner.encode('utf-8')).hexdigest()[:32] + '.json')
+
+def merge_into_history(df, content_hash, path):
+    """
+    Merge a cleaned personal finance upload into the saved history at path
+    Only the new rows are aggregated; an upload that was already merged is skipped
+    Returns the analysis and figures for the whole history
+    """
+    state = IncrementalFinanceState.load(path)
+    if state.update(df, content_hash):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        state.save(path)
+    analysis = state.summary()
+    figures = create_visualizations(df, analysis, balance_trend=state.daily_balance.reset_index())
+    return analysis, figures
+
+# Dataset store table for each analysis type
+STORE_KINDS = {
+    "Profit & Loss Statement": 'profit_loss',
+    "Personal Finance": 'personal_finance',
+    "Investment Portfolio": 'investment_portfolio',
+}
+
+SAMPLE_DATA_FILES = {
+    "Profit & Loss Statement": "sample_data/profit_loss.csv",
+    "Personal Finance": "sample_data/personal_finance.csv",
+    "Investment Portfolio": "sample_data/investment_portfolio.csv",
+}
+
+@st.cache_resource
+def get_dataset_store(path=DATASET_STORE_PATH):
+    """
+    Shared DatasetStore for the server process
+    """
+    return DatasetStore(path)
+
+def source_digest(source):
+    """
+    Content hash of an uploaded file or a file on disk, computed once and kept in the session
+    Uploads are keyed on their file_id and files on disk on their path, size and modification time,
+    so widget reruns neither copy nor hash the data again
+    """
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        key = (os.fspath(source), stat.st_size, stat.st_mtime_ns)
+    else:
+        key = source.file_id
+    digests = st.session_state.setdefault("content_hashes", {})
+    if key not in digests:
+        digests[key] = file_digest(source)
+    return digests[key]
+
+# Results are served from cache_resource: analysis never writes into the cleaned frame or the
+# figures, so every rerun can share the cached objects instead of unpickling fresh copies
+@st.cache_resource(max_entries=16, show_spinner="Processing data...")
+def load_and_analyze(content_hash, analysis_type, _raw, use_store=False):
+    """
+    Parse, clean and analyze an uploaded file, memoized on its content hash and the analysis type.
+    The file (an upload, a path or bytes) is excluded from Streamlit's argument hashing and only read
+    on a cache miss; content_hash identifies it.
+    With use_store, a file seen in an earlier session is read back from the dataset store instead of
+    being parsed again, and the analysis is pushed down to the store.
+    Returns the cleaned frame, the analysis results and the figures.
+    """
+    store = get_dataset_store() if use_store else None
+    kind = STORE_KINDS[analysis_type]
+    if store is not None and store.has_dataset(kind, content_hash):
+        df = store.load(kind, content_hash)
+    else:
+        df = read_dataset(_raw, columns=ANALYSIS_COLUMNS[analysis_type])
+        df = clean_and_validate_data(df, analysis_type)
+        if store is not None:
+            store.ingest(kind, df, content_hash)
+    
+    # Analysis never writes into df, so the cleaned frame is shared with display and download as is
+    if analysis_type == "Profit & Loss Statement":
+        analysis = calculate_metrics(df)
+        figures = []
+    elif analysis_type == "Personal Finance":
+        analysis = analyze_personal_finance(df, store=store, dataset_id=content_hash)
+        figures = create_visualizations(df, analysis)
+    else:  # Investment Portfolio
+        analysis = analyze_investment_portfolio(df, store=store, dataset_id=content_hash)
+        figures = create_investment_visualizations(df, analysis)
+    
+    return df, analysis, figures
+
+@st.cache_resource(max_entries=4, show_spinner="Analyzing in chunks...")
+def load_and_analyze_chunked(content_hash, _sources, chunksize=LARGE_FILE_CHUNK_ROWS, workers=ANALYSIS_WORKERS):
+    """
+    Out-of-core personal finance analysis of one or more uploaded files or server paths, memoized on their content hash
+    With several workers the files are partitioned and each partition is cleaned and aggregated chunk by chunk
+    in a process pool, otherwise the files are streamed chunk by chunk, so no process builds the full frame
+    Browser uploads themselves are held in memory by Streamlit, server paths are read from disk
+    Returns the analysis results and the figures
+    """
+    analysis = aggregate_sources(_sources, columns=ANALYSIS_COLUMNS["Personal Finance"],
+                                 max_workers=workers, chunksize=chunksize)
+    if analysis['invalid_dates']:
+        st.warning(f"Found {analysis['invalid_dates']} rows with invalid dates. These rows will be excluded.")
+    if analysis['invalid_amounts']:
+        st.warning(f"Found {analysis['invalid_amounts']} rows with invalid amounts. These rows will be excluded.")
+    figures = create_visualizations(None, analysis, balance_trend=analysis['balance_trend'])
+    return analysis, figures
+
 def main():
     st.set_page_config(layout="wide")
     
@@ -244,46 +570,103 @@ def main():
     # Show sample data option
     use_sample_data = st.sidebar.checkbox("Use Sample Data")
     
+    # Keep cleaned uploads in the local store so later sessions skip parsing
+    use_store = st.sidebar.checkbox("Keep uploads in local store")
+    
+    # Personal finance uploads can be merged into a history kept between sessions
+    merge_history = False
+    state_path = None
+    large_file_mode = False
+    if analysis_type == "Personal Finance":
+        # Files bigger than memory are parsed and aggregated in chunks, without the raw data view
+        large_file_mode = st.sidebar.checkbox("Large file mode")
+        merge_history = st.sidebar.checkbox("Merge into saved history", disabled=large_file_mode)
+        if merge_history:
+            # Histories are kept per signed-in user, or per name so shared deployments stay separate
+            owner = st.user.get("email") if st.user.get("is_logged_in") else None
+            if not owner:
+                owner = st.sidebar.text_input(
+                    "History name", key="history_name",
+                    help="Uploads are merged into the saved history with this name; pick a private one."
+                )
+            state_path = history_path(owner) if owner else None
+            if state_path is None:
+                st.sidebar.info("Enter a history name to merge uploads into it")
+            elif st.sidebar.button("Reset saved history"):
+                if os.path.exists(state_path):
+                    os.remove(state_path)
+                merged = st.session_state.get("merged_history", {})
+                for key in [key for key in merged if key[0] == state_path]:
+                    del merged[key]
+                st.sidebar.success("Saved history cleared")
+    
     if analysis_type == "Select Type...":
         st.info("Please select an analysis type from the sidebar to begin.")
         return
     
     try:
         if use_sample_data:
-            if analysis_type == "Profit & Loss Statement":
-                df = pd.read_csv("sample_data/profit_loss.csv")
-            elif analysis_type == "Personal Finance":
-                df = pd.read_csv("sample_data/personal_finance.csv")
-            else:  # Investment Portfolio
-                df = pd.read_csv("sample_data/investment_portfolio.csv")
+            raws = [SAMPLE_DATA_FILES[analysis_type]]
             st.success("Using sample data for demonstration")
         else:
-            uploaded_file = st.file_uploader(f"Upload your {analysis_type} CSV file", type=["csv"])
-            if not uploaded_file:
-                st.warning("Please upload a CSV file or use sample data")
+            # Large file mode also accepts several files, e.g. one per account or year
+            uploaded = st.file_uploader(
+                f"Upload your {analysis_type} file (CSV, gzip/zstd CSV, Parquet or Feather)",
+                type=SUPPORTED_EXTENSIONS,
+                accept_multiple_files=large_file_mode,
+                help=("Streamlit keeps uploaded files in server memory; files larger than memory "
+                      "must be placed in the server's large file directory instead.")
+                if large_file_mode else None
+            )
+            # The uploaded files themselves are passed on; they are only read when the cache misses
+            raws = (list(uploaded) if large_file_mode else [uploaded]) if uploaded else []
+            if large_file_mode and LARGE_FILE_DIR and os.path.isdir(LARGE_FILE_DIR):
+                server_files = sorted(
+                    name for name in os.listdir(LARGE_FILE_DIR)
+                    if name.rsplit('.', 1)[-1].lower() in SUPPORTED_EXTENSIONS
+                )
+                selected = st.multiselect(
+                    "Or analyze files from the server's large file directory", server_files,
+                    help="These files are read from disk chunk by chunk and never loaded whole."
+                )
+                raws += [os.path.join(LARGE_FILE_DIR, name) for name in selected]
+            if not raws:
+                st.warning("Please upload a data file or use sample data")
                 return
-            df = pd.read_csv(uploaded_file)
-        
-        # Clean and validate the data
-        df = clean_and_validate_data(df, analysis_type)
         
-        # Display raw data with download option
-        st.subheader("Raw Data")
-        st.dataframe(df)
-        
-        # Add download button for cleaned data
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="Download cleaned data as CSV",
-            data=csv,
-            file_name="cleaned_data.csv",
-            mime="text/csv"
-        )
+        # Parse, clean and analyze once per distinct file; widget reruns reuse the cached result.
+        # Each file is hashed once per upload, block by block, so reruns do not touch the data
+        if len(raws) == 1:
+            content_hash = source_digest(raws[0])
+        else:
+            content_hash = hashlib.sha256(
+                b"".join(bytes.fromhex(source_digest(raw)) for raw in raws)
+            ).hexdigest()
+        if large_file_mode:
+            analysis, figures = load_and_analyze_chunked(content_hash, raws)
+            st.caption(f"Analyzed {analysis['rows']:,} transactions from {len(raws)} file(s) "
+                       f"using {ANALYSIS_WORKERS} worker process(es)")
+        else:
+            df, analysis, figures = load_and_analyze(content_hash, analysis_type, raws[0], use_store)
+            
+            # Display one page of the raw data with download option
+            st.subheader("Raw Data")
+            render_raw_data(df)
+            
+            # Add download button for cleaned data; the file is only built when the button is clicked
+            export_label = st.selectbox("Download format", list(EXPORT_FORMATS), key="export_format")
+            export_format, export_name, export_mime = EXPORT_FORMATS[export_label]
+            st.download_button(
+                label=f"Download cleaned data as {export_label}",
+                data=lambda: export_dataset(df, export_format),
+                file_name=export_name,
+                mime=export_mime,
+                on_click="ignore"
+            )
         
         # Rest of your analysis code...
         if analysis_type == "Profit & Loss Statement":
-            pnl_data = df.to_dict('records')
-            metrics = calculate_metrics(pnl_data)
+            metrics = analysis
             
             st.header("Financial Metrics")
             metrics_df = pd.DataFrame(list(metrics.items()), 
@@ -291,12 +674,23 @@ def main():
             st.dataframe(metrics_df)
             
             if st.button("Generate P&L Insights"):
-                with st.spinner("Analyzing..."):
-                    report = generate_report(metrics)
-                    st.write(report)
+                st.write_stream(generate_report(metrics, stream=True))
                     
         elif analysis_type == "Personal Finance":
-            analysis = analyze_personal_finance(df)
+            if merge_history and state_path and not large_file_mode:
+                # Merge once per upload and history; reruns reuse the result without touching the file
+                merged = st.session_state.setdefault("merged_history", {})
+                key = (state_path, content_hash)
+                if key not in merged:
+                    try:
+                        merged[key] = merge_into_history(df, content_hash, state_path)
+                    except ValueError as e:
+                        merged[key] = str(e)
+                if isinstance(merged[key], str):
+                    st.warning(f"Could not merge into saved history: {merged[key]}")
+                else:
+                    analysis, figures = merged[key]
+                    st.caption("Showing totals for the saved history including this upload")
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -306,14 +700,11 @@ def main():
             with col3:
                 st.metric("Net Savings", f"${analysis['net_savings']:,.2f}")
             
-            figures = create_visualizations(df)
             for fig in figures:
                 st.plotly_chart(fig, use_container_width=True)
                 
         else:  # Investment Portfolio
-            analysis = analyze_investment_portfolio(df)
-            
-            col1, col2, col3, col4 = st.columns(4)
+            col1, col2, col3, col4, col5 = st.columns(5)
             with col1:
                 st.metric("Total Investment", f"${analysis['total_investment']:,.2f}")
             with col2:
@@ -321,24 +712,50 @@ def main():
             with col3:
                 st.metric("Total Gain/Loss", f"${analysis['total_gain_loss']:,.2f}")
             with col4:
-                st.metric("Average Return", f"{analysis['avg_return']:.2f}%")
+                st.metric("Value-Weighted Return", format_percent(analysis['value_weighted_return']))
+            with col5:
+                st.metric("Money-Weighted Return (XIRR)", format_percent(analysis['xirr']))
+            st.caption(f"Cost-weighted return {format_percent(analysis['cost_weighted_return'])}, "
+                       f"unweighted average {format_percent(analysis['avg_return'])}")
+            st.dataframe(analysis['type_returns'].style.format("{:.2f}%", na_rep="n/a"))
             
-            figures = create_investment_visualizations(df)
             for fig in figures:
                 st.plotly_chart(fig, use_container_width=True)
+            
+            # Optional daily closes turn the holdings snapshot into a value history
+            st.header("Portfolio History")
+            price_file = st.file_uploader(
+                "Upload a price history (date, asset, close) to chart value, drawdowns and volatility",
+                type=SUPPORTED_EXTENSIONS,
+                key="price_history"
+            )
+            if price_file:
+                # Hashed once per upload; reruns reuse the cached series and figures
+                skipped, (cumulative_twr, annual_twr), price_figures = get_portfolio_history(
+                    source_digest(price_file), content_hash, price_file, df
+                )
+                if skipped:
+                    st.warning(f"Skipped {skipped} holdings without a price on or before their purchase date.")
+                # Unlike XIRR, the time-weighted return ignores when and how much was bought
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Time-Weighted Return (TWR), cumulative", format_percent(cumulative_twr))
+                with col2:
+                    st.metric("Time-Weighted Return (TWR), annualized", format_percent(annual_twr),
+                              help="Histories shorter than a year are not annualized")
+                for fig in price_figures:
+                    st.plotly_chart(fig, use_container_width=True)
         
         # Common Q&A section
         st.header("Ask Questions About Your Data")
         user_question = st.text_input("What would you like to know about your financial data?")
         if user_question and st.button("Get Answer"):
-            with st.spinner("Analyzing..."):
-                question_prompt = (
-                    f"Based on the {analysis_type} data provided, please answer this question:\n"
-                    f"{user_question}\n"
-                    "Provide a detailed, analytical response."
-                )
-                answer = generate_report({"prompt": question_prompt})
-                st.write(answer)
+            question_prompt = (
+                f"Based on the {analysis_type} data provided, please answer this question:\n"
+                f"{user_question}\n"
+                "Provide a detailed, analytical response."
+            )
+            st.write_stream(generate_report({"prompt": question_prompt}, stream=True))
                 
     except Exception as e:
         st.error(f"Error processing data: {str(e)}")
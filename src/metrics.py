@@ -0,0 +1,218 @@
+import re
+from itertools import islice
+
+from src.dataio import iter_dataset_rows
+
+# pandas and NumPy are only needed by the vectorized paths and are imported there,
+# keeping `from src.metrics import calculate_metrics` cheap.
+
+
+# Ratio registry: name -> (numerator metric, denominator metric, scale).
+# A ratio whose denominator is zero or missing evaluates to 0.0.
+RATIOS = {
+    "Gross Profit Margin": ("Gross Profit", "Total Revenue", 100.0),
+    "Operating Profit Margin": ("Operating Profit (EBIT)", "Total Revenue", 100.0),
+    "Net Profit Margin": ("Net Profit After Tax", "Total Revenue", 100.0),
+    "COGS Percentage": ("Total COGS", "Total Revenue", 100.0),
+    "Operating Expense Ratio": ("Total Operating Expenses", "Total Revenue", 100.0),
+    "Marketing Efficiency": ("Total Revenue", "Marketing & Advertising", 1.0),
+    "Salaries & Wages Percentage": ("Salaries & Wages", "Total Revenue", 100.0),
+    "Interest Coverage Ratio": ("Operating Profit (EBIT)", "Interest Expense", 1.0),
+    "Depreciation Percentage": ("Depreciation", "Total Revenue", 100.0),
+    "Other Expenses Percentage": ("Other Expenses", "Total Revenue", 100.0),
+    "Net Other Income Percentage": ("Net Other Income/Expense", "Total Revenue", 100.0),
+    "Income Tax Percentage": ("Income Tax Expense", "Net Profit Before Tax", 100.0),
+}
+
+
+def iter_csv_rows(file_path):
+    """
+    Lazily yields the rows of a dataset file, one dictionary at a time.
+    Only the current row (or record batch, for columnar files) is held in memory, so the file size
+    does not matter. Gzip- and zstd-compressed CSV, Parquet and Feather/Arrow files are detected
+    from their contents; CSV values are strings, columnar values keep their types.
+    :param file_path: Path to the CSV, Parquet or Feather/Arrow file.
+    :return: Generator of row dictionaries.
+    """
+    try:
+        yield from iter_dataset_rows(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"The file '{file_path}' was not found.")
+    except Exception as e:
+        raise RuntimeError(f"An error occurred while reading the file: {e}")
+
+
+def iter_csv_batches(file_path, batch_size=10000):
+    """
+    Lazily yields the rows of a dataset file in fixed-size batches.
+    :param file_path: Path to the CSV, Parquet or Feather/Arrow file.
+    :param batch_size: Maximum number of rows per batch.
+    :return: Generator of lists of row dictionaries.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+    rows = iter_csv_rows(file_path)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def csv_to_json(file_path):
+    """
+    Transforms a CSV, Parquet or Feather/Arrow file into JSON.
+    For large files prefer iter_csv_rows, which does not materialize every row.
+    :param file_path: Path to the dataset file.
+    :return: JSON data as a list of dictionaries.
+    """
+    return list(iter_csv_rows(file_path))
+
+
+def compute_ratios(matrix, ratios=RATIOS):
+    """
+    Evaluates every registered ratio for many statements in one vectorized pass.
+    :param matrix: DataFrame with one row per statement (period, entity, ...) and one column per metric.
+    :param ratios: Ratio registry mapping names to (numerator, denominator, scale).
+    :return: DataFrame with the same index as matrix and one column per ratio.
+    """
+    import numpy as np
+    import pandas as pd
+
+    names = list(ratios)
+    numerators, denominators, scales = zip(*ratios.values())
+    values = matrix.reindex(columns=sorted(set(numerators) | set(denominators))).fillna(0.0)
+    num = values[list(numerators)].to_numpy(dtype='float64')
+    den = values[list(denominators)].to_numpy(dtype='float64')
+    result = np.zeros_like(num)
+    np.divide(num, den, out=result, where=den != 0)
+    result *= np.asarray(scales, dtype='float64')
+    return pd.DataFrame(result, index=matrix.index, columns=names)
+
+
+def _iter_rows(pnl_data):
+    """
+    Flattens an iterable of rows or of row batches into rows.
+    """
+    for item in pnl_data:
+        if isinstance(item, list):
+            yield from item
+        else:
+            yield item
+
+
+# Characters stripped from amounts before conversion: whitespace, thousands separators and currency symbols.
+# Amounts wrapped in parentheses are negative.
+_AMOUNT_NOISE = re.compile(r'[\s,$€£¥]')
+
+
+def _parse_amount(value):
+    """
+    Converts one raw amount into a float, treating unparseable values as 0.0.
+    Scalar counterpart of coerce_amounts.
+    """
+    if isinstance(value, (int, float)):
+        amount = float(value)
+    elif isinstance(value, str):
+        text = value.strip()
+        negative = text.startswith('(') and text.endswith(')')
+        text = _AMOUNT_NOISE.sub('', text.strip('()'))
+        try:
+            amount = float(text) if text else 0.0
+        except ValueError:
+            return 0.0
+        if negative:
+            amount = -amount
+    else:
+        return 0.0
+    return amount if amount == amount else 0.0
+
+
+def coerce_amounts(values):
+    """
+    Converts a Series of raw amounts into floats with vectorized string operations.
+    Strips whitespace, thousands separators and currency symbols, reads "(1,200)" as -1200
+    and treats unparseable values as 0.0.
+    :param values: Series of strings or numbers.
+    :return: float64 Series with the same index.
+    """
+    import pandas as pd
+
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        text = values.astype(str).str.strip()
+        negative = text.str.startswith('(') & text.str.endswith(')')
+        text = text.str.strip('()').str.replace(_AMOUNT_NOISE.pattern, '', regex=True)
+        numbers = pd.to_numeric(text, errors='coerce')
+        values = numbers.where(~negative, -numbers)
+    return pd.to_numeric(values, errors='coerce').fillna(0.0).astype('float64')
+
+
+def _metrics_from_pandas(pnl_data):
+    """
+    Builds the metric -> amount mapping from a DataFrame with metric and amount_month_usd
+    columns, or from a Series of amounts indexed by metric name.
+    """
+    if hasattr(pnl_data, 'columns'):
+        missing = [col for col in ('metric', 'amount_month_usd') if col not in pnl_data.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        names = pnl_data['metric']
+        amounts = coerce_amounts(pnl_data['amount_month_usd'])
+    else:
+        names = pnl_data.index.to_series()
+        amounts = coerce_amounts(pnl_data)
+    # Later rows win, as in the row-by-row path
+    return dict(zip(names.astype(str).str.strip(), amounts.tolist()))
+
+
+def calculate_metrics(pnl_data):
+    """
+    Calculates financial analytical metrics based on formulas.
+    A DataFrame (metric, amount_month_usd) or a Series of amounts indexed by metric is coerced in one
+    vectorized pass. Otherwise rows are consumed in a single pass, so any iterable works, including
+    the generators returned by iter_csv_rows and iter_csv_batches.
+    :param pnl_data: DataFrame, Series, or iterable of row dictionaries (P&L structure) or of batches of them.
+    :return: Calculated metrics as a dictionary.
+    """
+    if hasattr(pnl_data, 'index') and hasattr(pnl_data, 'dtypes'):
+        metrics_dict = _metrics_from_pandas(pnl_data)
+    else:
+        metrics_dict = {}
+        for item in _iter_rows(pnl_data):
+            metrics_dict[item.get('metric', '').strip()] = _parse_amount(item.get('amount_month_usd'))
+
+    # A single statement is cheaper to score in plain Python than through a one-row frame
+    calculated_metrics = {}
+    for name, (numerator, denominator, scale) in RATIOS.items():
+        divisor = metrics_dict.get(denominator, 0.0)
+        calculated_metrics[name] = (
+            (metrics_dict.get(numerator, 0.0) / divisor) * scale if divisor else 0.0
+        )
+    return calculated_metrics
+
+
+def calculate_metrics_batch(frame, keys=('entity', 'period'), metric_col='metric', amount_col='amount'):
+    """
+    Calculates the ratio table for many statements in a single grouped computation.
+    :param frame: Long-format DataFrame with the key columns plus one metric and one amount column.
+    :param keys: Columns identifying a statement, e.g. entity and period.
+    :param metric_col: Column holding the P&L line item name.
+    :param amount_col: Column holding the line item amount.
+    :return: Wide DataFrame indexed by keys with one column per ratio.
+    """
+    import pandas as pd
+
+    keys = list(keys)
+    missing = [col for col in keys + [metric_col, amount_col] if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    long = pd.DataFrame({
+        **{key: frame[key] for key in keys},
+        metric_col: frame[metric_col].astype(str).str.strip(),
+        amount_col: coerce_amounts(frame[amount_col]),
+    })
+    # Like calculate_metrics, the last amount seen for a metric wins
+    long = long.drop_duplicates(subset=keys + [metric_col], keep='last')
+    matrix = long.pivot(index=keys, columns=metric_col, values=amount_col)
+    return compute_ratios(matrix)
@@ -0,0 +1,178 @@
+import mmap
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from src.aggregation import aggregate_transaction_chunks, combine_partials, merge_partials, partial_aggregate
+from src.cleaning import enable_copy_on_write
+from src.dataio import count_batches, detect_format, iter_dataset_chunks
+
+# Target size of one CSV partition; large uploads are split into at least this many bytes per worker task
+PARTITION_BYTES = 64 * 1024 * 1024
+
+
+def _record_end(data, start, position):
+    """
+    Offset just past the first line break at or after position that ends a CSV record begun at start.
+    A line break is inside a quoted field when an odd number of quotes precedes it; escaped quotes
+    come in pairs and do not change the parity. data may be bytes or a memory-mapped file.
+    """
+    end = data.find(b'\n', position) + 1 or len(data)
+    quotes = data[start:end].count(b'"')
+    while quotes % 2 and end < len(data):
+        next_end = data.find(b'\n', end) + 1 or len(data)
+        quotes += data[end:next_end].count(b'"')
+        end = next_end
+    return end
+
+
+def csv_record_ranges(data, partitions):
+    """
+    Finds record boundaries that split plain CSV data into partitions.
+    Line breaks inside quoted fields are never used as boundaries, so multi-line values stay whole.
+    :param data: Uncompressed CSV file contents as bytes or a memory-mapped file.
+    :param partitions: Desired number of partitions; fewer are returned for short files.
+    :return: Tuple of (offset just past the header, list of (start, end) offsets of the partitions).
+    """
+    header_end = _record_end(data, 0, 0)
+    if header_end >= len(data):
+        return header_end, []
+    step = max((len(data) - header_end) // max(partitions, 1), 1)
+
+    ranges, start = [], header_end
+    while start < len(data):
+        end = _record_end(data, start, min(start + step, len(data)) - 1)
+        ranges.append((start, end))
+        start = end
+    return header_end, ranges
+
+
+def split_csv(data, partitions):
+    """
+    Splits plain CSV bytes into partitions at record boundaries; each partition repeats the header.
+    :param data: Uncompressed CSV file contents as bytes.
+    :param partitions: Desired number of partitions; fewer are returned for short files.
+    :return: List of CSV byte strings.
+    """
+    header_end, ranges = csv_record_ranges(data, partitions)
+    if partitions <= 1 or not ranges:
+        return [bytes(data)]
+    header = data[:header_end]
+    return [header + data[start:end] for start, end in ranges]
+
+
+def partition_sources(sources, partitions, partition_bytes=PARTITION_BYTES):
+    """
+    Splits uploads into independent partitions for parallel processing.
+    Every partition is a tuple of (source, batches, byte_range) that a worker reads chunk by chunk:
+    plain CSV is split at record boundaries, into byte ranges of files on disk or into byte strings
+    of in-memory data; Parquet and Arrow IPC files on disk are split by row group or record batch.
+    Compressed CSV and Arrow streams cannot be split and in-memory columnar data would be copied
+    to every worker, so each of those forms one streamed partition.
+    :param sources: Iterable of paths or file contents as bytes; aggregate_sources spills uploads to
+        disk first, so they are partitioned like files on disk.
+    :param partitions: Minimum number of partitions per splittable file, usually the worker count.
+    :param partition_bytes: Upper bound on the size of a CSV partition.
+    :return: List of partitions for _aggregate_partition.
+    """
+    result = []
+    for source in sources:
+        on_disk = isinstance(source, (str, os.PathLike))
+        file_format = detect_format(source)
+        size = os.path.getsize(source) if on_disk else len(source)
+
+        if file_format == 'csv' and size:
+            count = max(partitions, -(-size // partition_bytes))
+            if not on_disk:
+                result.extend((part, None, None) for part in split_csv(source, count))
+                continue
+            with open(source, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                header_end, ranges = csv_record_ranges(data, count)
+            result.extend([(source, None, (header_end, start, end)) for start, end in ranges]
+                          or [(source, None, None)])
+        elif file_format in ('parquet', 'arrow') and on_disk:
+            total = count_batches(source)
+            step = max(-(-total // partitions), 1)
+            result.extend((source, list(range(first, min(first + step, total))), None)
+                          for first in range(0, total, step))
+        else:
+            result.append((source, None, None))
+    return result
+
+
+def _spill(source, directory, name):
+    """
+    Copies an in-memory source to a file in directory block by block; paths are returned as they are.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return source
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as file:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            file.write(source)
+        else:
+            position = source.tell()
+            source.seek(0)
+            shutil.copyfileobj(source, file)
+            source.seek(position)
+    return path
+
+
+def _read_csv_range(path, header_end, start, end):
+    """
+    Reads the header and one record range of a CSV file as standalone CSV bytes.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(header_end)
+        file.seek(start)
+        return header + file.read(end - start)
+
+
+def _aggregate_partition(partition, columns, chunksize):
+    """
+    Worker task: parses, cleans and aggregates one partition chunk by chunk.
+    """
+    source, batches, byte_range = partition
+    if byte_range is not None:
+        source = _read_csv_range(source, *byte_range)
+    return combine_partials(
+        partial_aggregate(chunk) for chunk in iter_dataset_chunks(source, columns, chunksize, batches)
+    )
+
+
+def aggregate_sources(sources, columns=None, max_workers=None, chunksize=500000):
+    """
+    Personal-finance analysis of one or more uploads.
+    With several workers in-memory uploads are first spilled to temporary files, then every file is
+    partitioned and each partition is parsed, cleaned and aggregated chunk by chunk in its own
+    process; the partial results are then merged. With one worker the uploads are streamed chunk
+    by chunk in this process instead.
+    :param sources: Iterable of file contents as bytes, paths or seekable binary files.
+    :param columns: Optional list of columns to read.
+    :param max_workers: Number of worker processes; defaults to the CPU count.
+    :param chunksize: Maximum number of rows parsed at a time, in this process or in each worker.
+    :return: Dictionary as returned by merge_partials.
+    """
+    sources = list(sources)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1:
+        return aggregate_transaction_chunks(
+            chunk for source in sources for chunk in iter_dataset_chunks(source, columns, chunksize)
+        )
+
+    # In-memory uploads are spilled to temporary files, so workers read their own byte ranges or
+    # row groups from disk instead of receiving copies of the data
+    with tempfile.TemporaryDirectory(prefix='aggregate-') as spill_dir:
+        sources = [_spill(source, spill_dir, f'source-{i}') for i, source in enumerate(sources)]
+        partitions = partition_sources(sources, max_workers)
+        workers = min(max_workers, len(partitions))
+        # Workers are spawned, not forked: the pool is started from inside Streamlit's multi-threaded
+        # server, and forking a threaded process can deadlock the children on inherited locks
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=enable_copy_on_write) as executor:
+            partials = executor.map(_aggregate_partition, partitions,
+                                    [columns] * len(partitions), [chunksize] * len(partitions))
+            # Empty partitions, e.g. files with a header only, yield no partial result
+            return merge_partials(partial for partial in partials if partial is not None)
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+
+# Day count used to turn holding periods into years
+DAYS_PER_YEAR = 365.0
+
+
+def _as_of(as_of):
+    return pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of)
+
+
+def annualized_returns(purchase_price, current_value, purchase_date, as_of=None):
+    """
+    Holding-period returns of individual lots, annualized over the time since purchase.
+    Lots held for less than a year yield NaN rather than their plain holding-period return, so
+    the series stays in one unit; annualizing a few days of performance would extrapolate noise.
+    Lots with a non-positive cost or a purchase date after as_of also yield NaN.
+    :param purchase_price: Series of purchase costs.
+    :param current_value: Series of current values, aligned with purchase_price.
+    :param purchase_date: Series of purchase datetimes, aligned with purchase_price.
+    :param as_of: Valuation date of current_value; defaults to today.
+    :return: Series of returns in percent, with the index of purchase_price.
+    """
+    cost = purchase_price.to_numpy(dtype='float64')
+    value = current_value.to_numpy(dtype='float64')
+    years = (_as_of(as_of) - pd.DatetimeIndex(purchase_date)).days.to_numpy() / DAYS_PER_YEAR
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(cost > 0, value / cost, np.nan)
+        result = np.where(years >= 1.0, np.power(growth, 1.0 / years) - 1.0, np.nan) * 100.0
+    return pd.Series(result, index=purchase_price.index, name='Annualized_Return')
+
+
+def xirr(amounts, dates, guess=0.1, tol=1e-10, max_iterations=50):
+    """
+    Internal rate of return of irregularly dated cash flows, as in spreadsheet XIRR.
+    Flows on the same day are netted first, so the cost per iteration depends on the number of
+    distinct dates, not of lots. Newton's method is tried first; if it leaves the valid range
+    or does not converge, the root is bracketed and found by bisection.
+    :param amounts: Array-like of cash flows; investments negative, proceeds and values positive.
+    :param dates: Array-like of the flow dates.
+    :param guess: Starting rate for Newton's method.
+    :param tol: Convergence tolerance on the rate.
+    :param max_iterations: Newton iterations before falling back to bisection.
+    :return: Annual rate as a fraction, or NaN if the flows do not change sign.
+    """
+    amounts = np.asarray(amounts, dtype='float64')
+    days = pd.DatetimeIndex(dates).values.astype('datetime64[D]').astype('int64')
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    flows = np.bincount(inverse, weights=amounts)
+    if not ((flows > 0).any() and (flows < 0).any()):
+        return np.nan
+    years = (unique_days - unique_days[0]) / DAYS_PER_YEAR
+
+    def npv(rate):
+        return np.dot(flows, np.exp(-years * np.log1p(rate)))
+
+    rate = guess
+    for _ in range(max_iterations):
+        discount = np.exp(-years * np.log1p(rate))
+        value = np.dot(flows, discount)
+        derivative = -np.dot(flows * years, discount) / (1.0 + rate)
+        if derivative == 0 or not np.isfinite(derivative):
+            break
+        step = value / derivative
+        rate -= step
+        if not np.isfinite(rate) or rate <= -1.0:
+            break
+        if abs(step) < tol:
+            return rate
+
+    # Bracket a sign change between a total loss and ever higher rates, then bisect
+    low, high = -1.0 + 1e-9, 1.0
+    low_value = npv(low)
+    while np.sign(npv(high)) == np.sign(low_value):
+        high *= 2.0
+        if high > 1e9:
+            return np.nan
+    for _ in range(200):
+        middle = (low + high) / 2.0
+        middle_value = npv(middle)
+        if np.sign(middle_value) == np.sign(low_value):
+            low, low_value = middle, middle_value
+        else:
+            high = middle
+        if high - low < tol:
+            break
+    return (low + high) / 2.0
+
+
+def portfolio_xirr(purchase_price, current_value, purchase_date, as_of=None):
+    """
+    Money-weighted return of the whole portfolio: every lot is a purchase on its date and the
+    current values are one combined proceed on the valuation date.
+    :param purchase_price: Series of purchase costs.
+    :param current_value: Series of current values.
+    :param purchase_date: Series of purchase datetimes.
+    :param as_of: Valuation date of current_value; defaults to today.
+    :return: Annual rate in percent, or NaN if it is undefined.
+    """
+    as_of = _as_of(as_of)
+    dates = pd.DatetimeIndex(purchase_date)
+    held = (dates <= as_of) & np.isfinite(purchase_price.to_numpy(dtype='float64'))
+    if not held.any():
+        return np.nan
+    amounts = np.append(-purchase_price.to_numpy(dtype='float64')[held],
+                        current_value.to_numpy(dtype='float64')[held].sum())
+    return xirr(amounts, dates[held].append(pd.DatetimeIndex([as_of]))) * 100.0
+
+
+def type_sums(df):
+    """
+    Per-type sums behind every portfolio aggregate, computed in one grouped pass.
+    :param df: DataFrame with Type, Purchase_Price, Current_Value and Annual_Return columns.
+    :return: DataFrame indexed by Type with purchase, current, return_sum, value_weighted_sum,
+        cost_weighted_sum and holdings columns.
+    """
+    # Products are taken in float64: narrow integer inputs would silently wrap around
+    returns = df['Annual_Return'].astype('float64')
+    purchase = df['Purchase_Price'].astype('float64')
+    current = df['Current_Value'].astype('float64')
+    frame = pd.DataFrame({
+        'Type': df['Type'],
+        'purchase': purchase,
+        'current': current,
+        'return_sum': returns,
+        'value_weighted_sum': returns * current,
+        'cost_weighted_sum': returns * purchase,
+    })
+    return frame.groupby('Type', sort=True, observed=True).agg(
+        purchase=('purchase', 'sum'),
+        current=('current', 'sum'),
+        return_sum=('return_sum', 'sum'),
+        value_weighted_sum=('value_weighted_sum', 'sum'),
+        cost_weighted_sum=('cost_weighted_sum', 'sum'),
+        holdings=('current', 'size'),
+    )
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator != 0, numerator / denominator, np.nan)
+
+
+def summarize_type_sums(by_type):
+    """
+    Derives the portfolio totals and returns from per-type sums.
+    Works on the output of type_sums or on the same columns aggregated in SQL.
+    :param by_type: DataFrame indexed by Type with the type_sums columns.
+    :return: Dictionary with the totals, the unweighted, value-weighted and cost-weighted
+        returns, the type distribution and the per-type returns.
+    """
+    totals = by_type.sum()
+    type_returns = pd.DataFrame({
+        'Average_Return': _ratio(by_type['return_sum'], by_type['holdings']),
+        'Value_Weighted_Return': _ratio(by_type['value_weighted_sum'], by_type['current']),
+        'Cost_Weighted_Return': _ratio(by_type['cost_weighted_sum'], by_type['purchase']),
+    }, index=by_type.index)
+    return {
+        'total_investment': totals['purchase'],
+        'current_value': totals['current'],
+        'total_gain_loss': totals['current'] - totals['purchase'],
+        'avg_return': float(_ratio(totals['return_sum'], totals['holdings'])),
+        'value_weighted_return': float(_ratio(totals['value_weighted_sum'], totals['current'])),
+        'cost_weighted_return': float(_ratio(totals['cost_weighted_sum'], totals['purchase'])),
+        'type_distribution': by_type['current'].rename('Current_Value'),
+        'type_returns': type_returns,
+    }
@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.cleaning import parse_dates
+from src.dataio import file_digest, read_dataset
+from src.portfolio import DAYS_PER_YEAR
+
+PRICE_COLUMNS = ['date', 'asset', 'close']
+
+# Trading days per year, used to annualize daily volatility
+TRADING_DAYS = 252
+
+
+class PriceMatrix:
+    """
+    Dense daily close prices: one row per trading date and one column per asset, forward-filled
+    over gaps, with NaN before an asset's first close. Arrays may be read-only memory maps.
+    """
+
+    def __init__(self, dates, assets, closes):
+        """
+        :param dates: Sorted datetime64[D] array of trading dates.
+        :param assets: Array of asset names, one per column.
+        :param closes: float64 array of shape (len(dates), len(assets)).
+        """
+        self.dates = dates
+        self.assets = assets
+        self.closes = closes
+
+    @classmethod
+    def from_frame(cls, prices):
+        """
+        :param prices: Long DataFrame with date, asset and close columns; the last close per
+            date and asset wins and rows with an invalid date or close are dropped.
+        :return: PriceMatrix instance.
+        """
+        missing = [col for col in PRICE_COLUMNS if col not in prices.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        long = pd.DataFrame({
+            'date': parse_dates(prices['date']).dt.normalize(),
+            'asset': prices['asset'].astype(str),
+            'close': pd.to_numeric(prices['close'], errors='coerce'),
+        }).dropna()
+
+        date_codes, dates = pd.factorize(long['date'], sort=True)
+        asset_codes, assets = pd.factorize(long['asset'], sort=True)
+        closes = np.full((len(dates), len(assets)), np.nan)
+        closes[date_codes, asset_codes] = long['close'].to_numpy()
+        closes = pd.DataFrame(closes).ffill().to_numpy()
+        return cls(dates.values.astype('datetime64[D]'), np.asarray(assets, dtype=str), closes)
+
+    def save(self, directory):
+        """
+        Writes the matrix as .npy files, replacing the directory atomically.
+        :param directory: Destination directory.
+        """
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        temporary = tempfile.mkdtemp(dir=parent)
+        np.save(os.path.join(temporary, 'dates.npy'), self.dates)
+        np.save(os.path.join(temporary, 'assets.npy'), self.assets)
+        np.save(os.path.join(temporary, 'closes.npy'), self.closes)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(temporary, directory)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Opens a saved matrix; the closes are memory-mapped, so only the pages read are loaded.
+        :param directory: Directory written by save.
+        :return: PriceMatrix instance.
+        """
+        return cls(
+            np.load(os.path.join(directory, 'dates.npy')),
+            np.load(os.path.join(directory, 'assets.npy')),
+            np.load(os.path.join(directory, 'closes.npy'), mmap_mode='r'),
+        )
+
+
+def load_price_history(data, cache_dir, content_hash=None):
+    """
+    Builds the price matrix of an uploaded price history, reusing the memory-mapped cache from an
+    earlier session when the same file was seen before.
+    :param data: CSV (optionally compressed), Parquet or Arrow file as bytes, a path or a seekable
+        binary file; it is only read when the cache has no matrix for it.
+    :param cache_dir: Directory holding one cached matrix per file content hash.
+    :param content_hash: SHA-256 hex digest of data, if the caller already computed it.
+    :return: PriceMatrix instance.
+    """
+    directory = os.path.join(cache_dir, content_hash or file_digest(data))
+    if os.path.exists(os.path.join(directory, 'closes.npy')):
+        return PriceMatrix.load(directory)
+    PriceMatrix.from_frame(read_dataset(data, columns=PRICE_COLUMNS)).save(directory)
+    return PriceMatrix.load(directory)
+
+
+def portfolio_time_series(holdings, prices, window=21):
+    """
+    Daily value, drawdown and rolling volatility of a portfolio of lots.
+    Each lot buys Purchase_Price worth of its asset at the last close on or before Purchase_Date
+    and is held to the end of the history. Drawdown, volatility and the cumulative time-weighted
+    return use daily returns net of purchases, so buying more does not count as performance.
+    :param holdings: DataFrame with Asset, Purchase_Date and Purchase_Price columns.
+    :param prices: PriceMatrix instance.
+    :param window: Rolling window in trading days for the volatility.
+    :return: Tuple of (DataFrame with Date, Value, Drawdown, Volatility and Cumulative_Return
+        columns in percent where applicable, number of lots skipped for lack of a price).
+    """
+    asset_index = pd.Index(prices.assets)
+    columns = asset_index.get_indexer(holdings['Asset'].astype(str))
+    purchase_days = holdings['Purchase_Date'].values.astype('datetime64[D]')
+    rows = np.searchsorted(prices.dates, purchase_days, side='right') - 1
+
+    known = (columns >= 0) & (rows >= 0)
+    entry = np.full(len(holdings), np.nan)
+    entry[known] = prices.closes[rows[known], columns[known]]
+    cost = holdings['Purchase_Price'].to_numpy(dtype='float64')
+    valid = known & np.isfinite(entry) & (entry > 0) & np.isfinite(cost)
+    skipped = int((~valid).sum())
+    if not valid.any():
+        empty = pd.DataFrame({'Date': pd.DatetimeIndex([]), 'Value': [], 'Drawdown': [], 'Volatility': [],
+                              'Cumulative_Return': []})
+        return empty, skipped
+
+    # Only the held assets are read from the (possibly memory-mapped) matrix
+    held, held_columns = np.unique(columns[valid], return_inverse=True)
+    closes = np.nan_to_num(np.asarray(prices.closes[:, held]), nan=0.0)
+    units = np.zeros((len(prices.dates), len(held)))
+    np.add.at(units, (rows[valid], held_columns), cost[valid] / entry[valid])
+    values = (np.cumsum(units, axis=0) * closes).sum(axis=1)
+    inflows = np.bincount(rows[valid], weights=cost[valid], minlength=len(prices.dates))
+
+    start = rows[valid].min()
+    values, inflows, dates = values[start:], inflows[start:], prices.dates[start:]
+    previous = np.concatenate(([np.nan], values[:-1]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = np.where(previous > 0, (values - inflows) / previous - 1.0, np.nan)
+    index = np.cumprod(1.0 + np.nan_to_num(daily))
+    drawdown = (index / np.maximum.accumulate(index) - 1.0) * 100.0
+    volatility = pd.Series(daily).rolling(window).std().to_numpy() * np.sqrt(TRADING_DAYS) * 100.0
+
+    return pd.DataFrame({
+        'Date': pd.DatetimeIndex(dates),
+        'Value': values,
+        'Drawdown': drawdown,
+        'Volatility': volatility,
+        'Cumulative_Return': (index - 1.0) * 100.0,
+    }), skipped
+
+
+def time_weighted_return(series):
+    """
+    Time-weighted return of a portfolio history: the daily returns net of purchases chain-linked
+    from the first purchase to the last date, so the size and timing of purchases do not affect it.
+    Histories shorter than a year are not annualized, as in portfolio.annualized_returns.
+    :param series: DataFrame from portfolio_time_series.
+    :return: Tuple of (cumulative return in percent, annual rate in percent or NaN for histories
+        shorter than a year); both are NaN for an empty history.
+    """
+    if series.empty:
+        return np.nan, np.nan
+    cumulative = float(series['Cumulative_Return'].iloc[-1])
+    years = (series['Date'].iloc[-1] - series['Date'].iloc[0]).days / DAYS_PER_YEAR
+    if years < 1.0:
+        return cumulative, np.nan
+    return cumulative, ((1.0 + cumulative / 100.0) ** (1.0 / years) - 1.0) * 100.0
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+
+class ResponseCache:
+    """
+    Persistent, size-bounded LRU cache for LLM responses stored in SQLite.
+    Entries are keyed on a hash of the full request (model, messages, temperature, max_tokens)
+    and expire after ttl_seconds.
+    """
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=512):
+        """
+        :param path: Path of the SQLite database file, created on first use.
+        :param ttl_seconds: Age after which an entry is ignored and dropped; None keeps entries forever.
+        :param max_entries: Maximum number of entries kept; least recently used ones are evicted first.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer.")
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key_for(request):
+        """
+        Computes the content address of a request.
+        :param request: Dictionary with the model, messages, temperature and max_tokens.
+        :return: Hex SHA-256 digest of the canonical JSON encoding of those fields.
+        """
+        fields = {name: request.get(name) for name in ('model', 'messages', 'temperature', 'max_tokens')}
+        canonical = json.dumps(fields, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _is_expired(self, created_at, now):
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, request):
+        """
+        Looks up a cached response.
+        :param request: Request dictionary as passed to the chat completions API.
+        :return: Cached response text, or None on a miss or an expired entry.
+        """
+        key = self.key_for(request)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if self._is_expired(created_at, now):
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return response
+
+    def set(self, request, response):
+        """
+        Stores a response, then drops expired entries and evicts down to max_entries.
+        :param request: Request dictionary as passed to the chat completions API.
+        :param response: Response text to cache.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (self.key_for(request), response, now, now),
+            )
+            if self.ttl_seconds is not None:
+                conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        """
+        Removes every cached response.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+    def __len__(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
@@ -0,0 +1,205 @@
+import sqlite3
+import time
+from contextlib import closing
+
+import pandas as pd
+
+from src.aggregation import summarize_category_sums
+from src.portfolio import portfolio_xirr, summarize_type_sums
+
+# Table layout per dataset kind: column definitions and the columns indexed for filtering
+SCHEMAS = {
+    'personal_finance': {
+        'columns': {'Category': 'TEXT', 'Amount': 'REAL', 'Date': 'TEXT'},
+        'indexes': [('Date',), ('Category',)],
+        'dates': ['Date'],
+    },
+    'investment_portfolio': {
+        'columns': {
+            'Asset': 'TEXT', 'Type': 'TEXT', 'Purchase_Date': 'TEXT',
+            'Purchase_Price': 'REAL', 'Current_Value': 'REAL', 'Annual_Return': 'REAL',
+        },
+        'indexes': [('Asset',), ('Type',), ('Purchase_Date',)],
+        'dates': ['Purchase_Date'],
+    },
+    'profit_loss': {
+        'columns': {'metric': 'TEXT', 'amount_month_usd': 'NUMERIC'},
+        'indexes': [('metric',)],
+        'dates': [],
+    },
+}
+
+_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class DatasetStore:
+    """
+    Embedded SQLite store for cleaned datasets.
+    Each upload is ingested once under its content hash; later analyses read it back or
+    push filters and aggregations down to SQL instead of re-parsing the file.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the SQLite database file, created on first use.
+        """
+        self.path = str(path)
+        with closing(self._connect()) as conn, conn:
+            primary_key = [row[1] for row in conn.execute("PRAGMA table_info(datasets)") if row[5]]
+            legacy = primary_key == ['dataset_id']
+            if legacy:
+                # Older stores keyed datasets on the content hash alone; the same bytes may be
+                # ingested as several kinds, so key them on (dataset_id, kind)
+                conn.execute("ALTER TABLE datasets RENAME TO datasets_by_id")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS datasets ("
+                "dataset_id TEXT NOT NULL, kind TEXT NOT NULL, name TEXT, "
+                "row_count INTEGER NOT NULL, ingested_at REAL NOT NULL, PRIMARY KEY (dataset_id, kind))"
+            )
+            if legacy:
+                conn.execute("INSERT INTO datasets SELECT dataset_id, kind, name, row_count, ingested_at "
+                             "FROM datasets_by_id")
+                conn.execute("DROP TABLE datasets_by_id")
+            for kind, schema in SCHEMAS.items():
+                columns = ", ".join(f'"{name}" {sql_type}' for name, sql_type in schema['columns'].items())
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {kind} (dataset_id TEXT NOT NULL, {columns})")
+                for indexed in schema['indexes']:
+                    index_name = f"{kind}_{'_'.join(indexed).lower()}"
+                    index_columns = ", ".join(f'"{name}"' for name in indexed)
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {kind} (dataset_id, {index_columns})")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def has_dataset(self, kind, dataset_id):
+        """
+        :param kind: One of the SCHEMAS keys.
+        :param dataset_id: Content hash of an upload.
+        :return: True if the dataset was already ingested as this kind.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM datasets WHERE dataset_id = ? AND kind = ?", (dataset_id, kind)
+            ).fetchone()
+        return row is not None
+
+    def ingest(self, kind, df, dataset_id, name=None):
+        """
+        Stores a cleaned dataset once per kind; ingesting the same dataset_id and kind again is a no-op.
+        :param kind: One of the SCHEMAS keys.
+        :param df: Cleaned DataFrame containing the schema columns.
+        :param dataset_id: Content hash of the upload.
+        :param name: Optional display name, e.g. the uploaded file name.
+        :return: True if rows were written, False if the dataset already existed.
+        """
+        schema = SCHEMAS[kind]
+        if self.has_dataset(kind, dataset_id):
+            return False
+
+        rows = df[list(schema['columns'])].copy()
+        for column in schema['dates']:
+            rows[column] = pd.to_datetime(rows[column]).dt.strftime(_DATE_FORMAT)
+        rows.insert(0, 'dataset_id', dataset_id)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO datasets (dataset_id, kind, name, row_count, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                (dataset_id, kind, name, len(rows), time.time()),
+            )
+            placeholders = ", ".join("?" * len(rows.columns))
+            column_list = ", ".join(f'"{name}"' for name in rows.columns)
+            conn.executemany(
+                f"INSERT INTO {kind} ({column_list}) VALUES ({placeholders})",
+                rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None),
+            )
+        return True
+
+    def load(self, kind, dataset_id):
+        """
+        Reads a stored dataset back as a cleaned DataFrame.
+        :param kind: One of the SCHEMAS keys.
+        :param dataset_id: Content hash of the upload.
+        :return: DataFrame with the schema columns, dates parsed.
+        """
+        schema = SCHEMAS[kind]
+        if not self.has_dataset(kind, dataset_id):
+            raise KeyError(f"No {kind} dataset {dataset_id} in the store.")
+        column_list = ", ".join(f'"{name}"' for name in schema['columns'])
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(
+                f"SELECT {column_list} FROM {kind} WHERE dataset_id = ? ORDER BY rowid",
+                conn, params=(dataset_id,),
+            )
+        for column in schema['dates']:
+            df[column] = pd.to_datetime(df[column], format=_DATE_FORMAT)
+        return df
+
+    @staticmethod
+    def _where(dataset_id, date_column=None, start=None, end=None, column=None, values=None):
+        """
+        Builds a WHERE clause restricted to one dataset plus optional date range and value filters.
+        """
+        clauses, params = ["dataset_id = ?"], [dataset_id]
+        if start is not None:
+            clauses.append(f'"{date_column}" >= ?')
+            params.append(pd.Timestamp(start).strftime(_DATE_FORMAT))
+        if end is not None:
+            clauses.append(f'"{date_column}" <= ?')
+            params.append(pd.Timestamp(end).strftime(_DATE_FORMAT))
+        if values is not None:
+            values = list(values)
+            clauses.append(f'"{column}" IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        return " AND ".join(clauses), params
+
+    def personal_finance_summary(self, dataset_id, start=None, end=None, categories=None):
+        """
+        Aggregates stored transactions in SQL.
+        :param dataset_id: Content hash of the upload.
+        :param start: Optional first date (inclusive).
+        :param end: Optional last date (inclusive).
+        :param categories: Optional iterable of categories to keep.
+        :return: Dictionary as returned by summarize_category_sums.
+        """
+        where, params = self._where(dataset_id, 'Date', start, end, 'Category', categories)
+        with closing(self._connect()) as conn:
+            grouped = pd.read_sql_query(
+                f'SELECT "Category", "Amount" > 0 AS "Is_Income", SUM("Amount") AS "Amount" '
+                f'FROM personal_finance WHERE {where} GROUP BY 1, 2 ORDER BY 1, 2',
+                conn, params=params,
+            )
+        grouped['Is_Income'] = grouped['Is_Income'].astype(bool)
+        return summarize_category_sums(grouped.set_index(['Category', 'Is_Income'])['Amount'])
+
+    def portfolio_summary(self, dataset_id, start=None, end=None, types=None, as_of=None):
+        """
+        Aggregates stored holdings per asset type in SQL.
+        The money-weighted return is solved from the holdings netted per purchase date.
+        :param dataset_id: Content hash of the upload.
+        :param start: Optional earliest purchase date (inclusive).
+        :param end: Optional latest purchase date (inclusive).
+        :param types: Optional iterable of asset types to keep.
+        :param as_of: Valuation date of Current_Value; defaults to today.
+        :return: Dictionary with the summary keys of analyze_investment_portfolio; per-holding
+            series are not included.
+        """
+        where, params = self._where(dataset_id, 'Purchase_Date', start, end, 'Type', types)
+        with closing(self._connect()) as conn:
+            by_type = pd.read_sql_query(
+                f'SELECT "Type", SUM("Purchase_Price") AS purchase, SUM("Current_Value") AS current, '
+                f'SUM("Annual_Return") AS return_sum, '
+                f'SUM("Annual_Return" * "Current_Value") AS value_weighted_sum, '
+                f'SUM("Annual_Return" * "Purchase_Price") AS cost_weighted_sum, COUNT(*) AS holdings '
+                f'FROM investment_portfolio WHERE {where} GROUP BY 1 ORDER BY 1',
+                conn, params=params,
+            ).set_index('Type')
+            by_date = pd.read_sql_query(
+                f'SELECT "Purchase_Date", SUM("Purchase_Price") AS purchase, SUM("Current_Value") AS current '
+                f'FROM investment_portfolio WHERE {where} GROUP BY 1',
+                conn, params=params,
+            )
+        return {
+            **summarize_type_sums(by_type),
+            'xirr': portfolio_xirr(by_date['purchase'], by_date['current'],
+                                   pd.to_datetime(by_date['Purchase_Date'], format=_DATE_FORMAT), as_of),
+        }
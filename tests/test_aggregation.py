@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from src.aggregation import IncrementalFinanceState, aggregate_transaction_chunks, aggregate_transactions
+
+
+def make_transactions():
+    return pd.DataFrame({
+        "Category": ["Salary", "Rent", "Food", "Food", "Refund", "Food"],
+        "Amount": [5000.0, -1500.0, -80.5, -19.5, 25.0, 0.0],
+        "Date": pd.to_datetime(["2024-11-01", "2024-11-02", "2024-11-03", "2024-11-04", "2024-11-05", "2024-11-06"]),
+    })
+
+def test_aggregate_transactions_matches_row_wise_analysis():
+    df = make_transactions()
+
+    result = aggregate_transactions(df)
+
+    legacy = df.assign(Type=df["Amount"].apply(lambda x: "Income" if x > 0 else "Expense"))
+    expected_summary = legacy.groupby(["Category", "Type"])["Amount"].sum().reset_index()
+    assert result["total_income"] == 5025.0
+    assert result["total_expenses"] == 1600.0
+    assert result["net_savings"] == 3425.0
+    pd.testing.assert_frame_equal(result["category_summary"], expected_summary)
+    pd.testing.assert_series_equal(result["category_totals"], df.groupby("Category")["Amount"].sum())
+    assert "Type" not in df.columns
+
+def test_incremental_state_matches_full_recompute_and_persists(tmp_path):
+    df = make_transactions()
+    older, newer = df.iloc[:3], df.iloc[3:]
+    path = tmp_path / "state.json"
+
+    state = IncrementalFinanceState()
+    assert state.update(older, content_hash="october")
+    state.save(path)
+    state = IncrementalFinanceState.load(path)
+    assert state.update(newer, content_hash="november")
+    assert not state.update(newer, content_hash="november")
+    state.save(path)
+    state = IncrementalFinanceState.load(path)
+
+    full = aggregate_transactions(df)
+    merged = state.summary()
+    assert merged["total_income"] == full["total_income"]
+    assert merged["total_expenses"] == full["total_expenses"]
+    pd.testing.assert_frame_equal(merged["category_summary"], full["category_summary"])
+    assert state.balance == df["Amount"].sum()
+    assert state.daily_balance.tolist() == df["Amount"].cumsum().tolist()
+
+    with pytest.raises(ValueError, match="before the saved history ends"):
+        state.update(older, content_hash="october-again")
+
+def test_chunked_aggregation_matches_in_memory_path():
+    from src.dataio import iter_dataset_chunks
+
+    raw = make_transactions().assign(Date=lambda d: d["Date"].dt.strftime("%Y-%m-%d"))
+    raw.loc[len(raw)] = ["Food", "n/a", "2024-11-07"]
+    raw.loc[len(raw)] = ["Food", "-5", "not a date"]
+    data = raw.to_csv(index=False).encode("utf-8")
+
+    result = aggregate_transaction_chunks(iter_dataset_chunks(data, chunksize=3))
+
+    expected = aggregate_transactions(make_transactions())
+    assert (result["total_income"], result["total_expenses"]) == (5025.0, 1600.0)
+    pd.testing.assert_frame_equal(result["category_summary"], expected["category_summary"])
+    assert (result["rows"], result["invalid_dates"], result["invalid_amounts"]) == (6, 1, 1)
+    assert result["balance_trend"]["Cumulative Balance"].iloc[-1] == 3425.0
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from src.charts import minmax_downsample_indices
+
+
+def test_minmax_downsample_keeps_budget_endpoints_and_extremes():
+    values = np.random.default_rng(0).normal(size=100_000).cumsum()
+
+    selected = minmax_downsample_indices(values, 500)
+
+    assert len(selected) <= 500
+    assert selected[0] == 0 and selected[-1] == len(values) - 1
+    assert np.all(np.diff(selected) > 0)
+    assert values[selected].max() == values.max()
+    assert values[selected].min() == values.min()
+    assert len(minmax_downsample_indices(values[:300], 500)) == 300
+
+def test_balance_trend_uses_webgl_for_large_ledgers_with_default_settings():
+    import pandas as pd
+    from src.main import BALANCE_TREND_MAX_POINTS, WEBGL_ROW_THRESHOLD, create_visualizations
+
+    rows = WEBGL_ROW_THRESHOLD + 1
+    df = pd.DataFrame({
+        "Category": ["Food"] * rows,
+        "Amount": np.random.default_rng(0).normal(size=rows),
+        "Date": pd.date_range("2020-01-01", periods=rows, freq="h"),
+    })
+
+    trend = create_visualizations(df)[2].data[0]
+    small = create_visualizations(df.iloc[:100])[2].data[0]
+
+    assert trend.type == "scattergl" and len(trend.x) <= BALANCE_TREND_MAX_POINTS
+    assert small.type == "scatter"
@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+from src.cleaning import clean_transactions, detect_date_format, parse_dates
+
+
+def test_parse_dates_matches_inference_and_marks_invalid_values():
+    values = pd.Series(["2024-03-01", "2024-03-02", None, "not a date", "2024-03-01"] * 20, name="Date")
+
+    parsed = parse_dates(values)
+
+    expected = pd.to_datetime(values, errors="coerce", format="%Y-%m-%d")
+    pd.testing.assert_series_equal(parsed, expected)
+    assert parsed.isna().sum() == 40
+
+def test_detect_date_format_prefers_iso_and_resolves_day_first():
+    assert detect_date_format(["2024-03-01", "2024-12-31"]) == "%Y-%m-%d"
+    assert detect_date_format(["03/01/2024", "12/31/2024"]) == "%m/%d/%Y"
+    assert detect_date_format(["01/03/2024", "31/12/2024"]) == "%d/%m/%Y"
+    assert detect_date_format([]) is None
+
+def test_detect_date_format_does_not_depend_on_earlier_files():
+    day_first = parse_dates(pd.Series(["13/01/2024", "25/02/2024"]))
+    month_first = parse_dates(pd.Series(["01/13/2024", "02/25/2024"]))
+
+    assert day_first.tolist() == [pd.Timestamp("2024-01-13"), pd.Timestamp("2024-02-25")]
+    assert month_first.tolist() == [pd.Timestamp("2024-01-13"), pd.Timestamp("2024-02-25")]
+    assert detect_date_format(["01/13/2024", "02/25/2024"]) == "%m/%d/%Y"
+
+def test_clean_transactions_reuses_parsed_dates():
+    df = pd.DataFrame({
+        "Category": ["Salary", "Rent"],
+        "Amount": ["5000", "-1500"],
+        "Date": parse_dates(pd.Series(["03/01/2024", "03/02/2024"])),
+    })
+
+    cleaned, invalid_dates, invalid_amounts = clean_transactions(df)
+
+    assert cleaned["Date"].dt.day.tolist() == [1, 2]
+    assert (invalid_dates, invalid_amounts) == (0, 0)
+
+def test_compact_dtypes_shrinks_frame_without_changing_aggregates():
+    from src.aggregation import aggregate_transactions
+    from src.cleaning import compact_dtypes, frame_memory
+
+    df, _, _ = clean_transactions(pd.DataFrame({
+        "Category": ["Rent", "Food", "Salary", "Food"] * 250,
+        "Amount": [-1500.0, -20.25, 5000.0, -4.5] * 250,
+        "Date": ["2024-03-01"] * 1000,
+        "Count": [1, 2, 3, 4] * 250,
+    }))
+
+    compact = compact_dtypes(df)
+
+    assert isinstance(compact["Category"].dtype, pd.CategoricalDtype)
+    assert compact["Amount"].dtype == "float64"
+    assert compact["Count"].dtype == "int64"
+    assert "Is_Income" not in compact.columns
+    assert frame_memory(compact) < frame_memory(df)
+    expected, result = aggregate_transactions(df), aggregate_transactions(compact)
+    pd.testing.assert_frame_equal(result["category_summary"], expected["category_summary"])
+    pd.testing.assert_series_equal(result["category_totals"], expected["category_totals"])
+
+def test_compact_dtypes_keeps_integer_measures_wide():
+    from src.cleaning import compact_dtypes
+    from src.portfolio import summarize_type_sums, type_sums
+
+    df = pd.DataFrame({
+        "Type": ["Stock", "Bond"] * 50,
+        "Purchase_Price": [1000, 2000] * 50,
+        "Current_Value": [1200, 2300] * 50,
+        "Annual_Return": [20, 15] * 50,
+    })
+
+    compact = compact_dtypes(df)
+
+    assert isinstance(compact["Type"].dtype, pd.CategoricalDtype)
+    assert compact["Purchase_Price"].dtype == "int64"
+    assert summarize_type_sums(type_sums(compact))["value_weighted_return"] == pytest.approx(58500 / 3500)
+
+def test_cleaning_does_not_mutate_its_input():
+    from src.cleaning import clean_holdings
+
+    transactions = pd.DataFrame({"Category": ["Rent", "Food"], "Amount": ["-1500", "x"], "Date": ["2024-03-01", "2024-03-02"]})
+    holdings = pd.DataFrame({
+        "Asset": ["AAPL", "BND"], "Type": ["Stock", "Bond"], "Purchase_Date": ["2024-01-02", "bad"],
+        "Purchase_Price": ["100", "50"], "Current_Value": ["120", "55"], "Annual_Return": ["20", "10"],
+    })
+    before = transactions.copy(), holdings.copy()
+
+    cleaned, invalid_dates, invalid_amounts = clean_transactions(transactions)
+    kept, removed = clean_holdings(holdings)
+
+    pd.testing.assert_frame_equal(transactions, before[0])
+    pd.testing.assert_frame_equal(holdings, before[1])
+    assert (len(cleaned), invalid_dates, invalid_amounts) == (1, 0, 1)
+    assert (len(kept), removed) == (1, 1)
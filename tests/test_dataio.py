@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from src.dataio import (
+    detect_format, export_dataset, file_digest, iter_dataset_chunks, iter_dataset_rows, read_dataset
+)
+from src.metrics import calculate_metrics, iter_csv_rows
+
+
+FRAME = pd.DataFrame({
+    "Category": ["Salary", "Rent"],
+    "Amount": [5000.0, -1500.0],
+    "Date": ["2024-11-01", "2024-11-02"],
+    "Memo": ["november", "flat"],
+})
+
+
+def encode(file_format):
+    csv_bytes = FRAME.to_csv(index=False).encode("utf-8")
+    if file_format == "csv":
+        return csv_bytes
+    if file_format == "csv.gz":
+        return gzip.compress(csv_bytes)
+    if file_format == "csv.zst":
+        sink = pa.BufferOutputStream()
+        with pa.CompressedOutputStream(sink, "zstd") as stream:
+            stream.write(csv_bytes)
+        return sink.getvalue().to_pybytes()
+    buffer = io.BytesIO()
+    if file_format == "parquet":
+        FRAME.to_parquet(buffer)
+    else:
+        FRAME.to_feather(buffer)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize("file_format", ["csv", "csv.gz", "csv.zst", "parquet", "arrow"])
+def test_read_dataset_detects_format_and_projects_columns(file_format):
+    raw = encode(file_format)
+
+    assert detect_format(raw) == file_format
+    df = read_dataset(raw, columns=["Category", "Amount", "Date", "Not_In_File"])
+
+    assert list(df.columns) == ["Category", "Amount", "Date"]
+    assert pd.to_numeric(df["Amount"]).tolist() == [5000.0, -1500.0]
+    rows = list(iter_dataset_rows(io.BytesIO(raw), columns=["Category"]))
+    assert rows == [{"Category": "Salary"}, {"Category": "Rent"}]
+
+def test_iter_csv_rows_reads_compressed_files(tmp_path):
+    path = tmp_path / "pnl.csv.gz"
+    path.write_bytes(gzip.compress(b"metric,amount_month_usd\nTotal Revenue,1000\nGross Profit,250\n"))
+
+    assert calculate_metrics(iter_csv_rows(path))["Gross Profit Margin"] == 25.0
+
+@pytest.mark.parametrize("file_format", ["csv", "csv.gz", "parquet"])
+def test_export_dataset_round_trips(file_format):
+    raw = export_dataset(FRAME, file_format, chunk_size=1)
+
+    assert detect_format(raw) == file_format
+    pd.testing.assert_frame_equal(read_dataset(raw), FRAME)
+
+@pytest.mark.parametrize("file_format", ["csv", "csv.gz", "csv.zst", "parquet", "arrow"])
+def test_file_objects_are_streamed_and_hashed_without_closing(file_format, tmp_path):
+    raw = encode(file_format)
+    upload = io.BytesIO(raw)
+    path = tmp_path / "upload"
+    path.write_bytes(raw)
+
+    chunks = list(iter_dataset_chunks(upload, columns=["Amount"], chunksize=1))
+
+    assert not upload.closed
+    assert pd.concat(chunks)["Amount"].tolist() == [5000.0, -1500.0]
+    expected = hashlib.sha256(raw).hexdigest()
+    assert file_digest(upload, block_size=7) == file_digest(path) == file_digest(raw) == expected
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_api_reads_columnar_statements(file_format, tmp_path):
+    import API
+
+    statement = pd.DataFrame({"metric": ["Total Revenue", "Gross Profit"], "amount_month_usd": [1000.0, 250.0]})
+    path = tmp_path / f"pnl.{file_format}"
+    if file_format == "parquet":
+        statement.to_parquet(path)
+    else:
+        statement.to_feather(path)
+
+    assert API.csv_to_json(str(path)) == statement.to_dict("records")
+    assert API.calculate_metrics(API.iter_csv_rows(str(path)))["Gross Profit Margin"] == 25.0
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.main import page_frame
+
+
+def test_page_frame_filters_sorts_and_clamps_pages():
+    df = pd.DataFrame({
+        "Category": ["Rent", "Salary", "Groceries", "Rent", "Coffee"],
+        "Amount": [-1500.0, 5000.0, -120.0, -1450.0, -4.5],
+    })
+
+    view, page, matching = page_frame(df, page=1, page_size=2, sort_by="Amount", ascending=True)
+    assert view["Amount"].tolist() == [-1500.0, -1450.0]
+    assert (page, matching) == (1, 5)
+
+    view, page, matching = page_frame(df, page=9, page_size=2, search="rEnT")
+    assert view.index.tolist() == [0, 3]
+    assert (page, matching) == (1, 2)
+
+    view, page, matching = page_frame(df, page=1, page_size=2, search="nothing")
+    assert view.empty and (page, matching) == (1, 0)
+
+def test_validate_csv_structure_parses_dates_once_for_cleaning():
+    from src.main import validate_and_parse_csv, validate_csv_structure
+
+    df = pd.DataFrame({"Category": ["Rent", "Food"], "Amount": [-1500, -20], "Date": ["2024-03-01", "bad"]})
+
+    errors, file_type, parsed = validate_and_parse_csv(df)
+
+    assert validate_csv_structure(df) == (errors, file_type)
+
+    assert file_type == "Personal Finance"
+    assert errors == ["Date column contains invalid dates"]
+    assert pd.api.types.is_datetime64_any_dtype(parsed["Date"])
+    assert df["Date"].tolist() == ["2024-03-01", "bad"]
+
+def test_page_frame_searches_categorical_columns():
+    df = pd.DataFrame({"Category": pd.Categorical(["Rent", "Salary", "Rent"]), "Amount": [-1.0, 2.0, -3.0]})
+
+    view, page, matching = page_frame(df, page=1, page_size=10, search="ren")
+
+    assert view.index.tolist() == [0, 2]
+
+def test_analyze_investment_portfolio_returns_derived_columns_without_mutating():
+    from src.main import analyze_investment_portfolio
+
+    df = pd.DataFrame({
+        "Type": ["Stock", "Bond"], "Purchase_Date": pd.to_datetime(["2024-01-02", "2024-01-03"]),
+        "Purchase_Price": [100.0, 50.0], "Current_Value": [120.0, 45.0], "Annual_Return": [20.0, -10.0],
+    })
+    columns = list(df.columns)
+
+    result = analyze_investment_portfolio(df)
+
+    assert list(df.columns) == columns
+    assert result["gain_loss"].tolist() == [20.0, -5.0]
+    assert result["return_percentage"].tolist() == [20.0, -10.0]
+
+def test_investment_figures_show_annualized_returns_from_the_analysis():
+    from src.main import analyze_investment_portfolio, create_investment_visualizations
+
+    df = pd.DataFrame({
+        "Asset": ["AAPL", "BND"], "Type": ["Stock", "Bond"],
+        "Purchase_Date": pd.to_datetime(["2022-01-01", "2023-07-01"]),
+        "Purchase_Price": [100.0, 50.0], "Current_Value": [121.0, 45.0], "Annual_Return": [20.0, -10.0],
+    })
+    analysis = analyze_investment_portfolio(df, as_of=pd.Timestamp("2022-01-01") + pd.Timedelta(days=730))
+
+    figures = create_investment_visualizations(df, analysis)
+
+    annualized, waterfall = figures[2], figures[3]
+    assert "Annualized" in annualized.layout.title.text
+    values = [value for trace in annualized.data for value in trace.y]
+    assert values[0] == pytest.approx(10.0) and np.isnan(values[1])
+    assert list(waterfall.data[0].y) == [21.0, -5.0]
+    assert list(df.columns) == ["Asset", "Type", "Purchase_Date", "Purchase_Price", "Current_Value", "Annual_Return"]
+
+def test_histories_are_kept_per_owner(tmp_path):
+    from src.main import history_path, merge_into_history
+
+    df = pd.DataFrame({"Category": ["Salary"], "Amount": [100.0], "Date": pd.to_datetime(["2024-03-01"])})
+    alice, bob = history_path("alice", tmp_path), history_path("bob", tmp_path)
+
+    analysis, _ = merge_into_history(df, "upload-1", alice)
+
+    assert alice != bob
+    assert analysis["total_income"] == 100.0
+    assert (tmp_path / alice.split("/")[-1]).exists() and not (tmp_path / bob.split("/")[-1]).exists()
+
+def test_format_percent_shows_undefined_returns_as_not_available():
+    from src.main import format_percent
+
+    assert format_percent(12.345) == "12.35%"
+    assert format_percent(float("nan")) == "n/a"
+
+def test_source_digest_hashes_each_upload_once(monkeypatch, tmp_path):
+    import io
+    import src.main as main
+
+    calls = []
+    monkeypatch.setattr(main, "file_digest", lambda source: calls.append(source) or "digest")
+
+    class Upload(io.BytesIO):
+        file_id = "upload-1"
+
+    upload, path = Upload(b"a,b\n1,2\n"), tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n1,2\n")
+
+    assert [main.source_digest(upload) for _ in range(3)] == ["digest"] * 3
+    assert [main.source_digest(str(path)) for _ in range(3)] == ["digest"] * 3
+    assert calls == [upload, str(path)]
+
+def test_portfolio_history_is_built_once_per_price_and_holdings_upload(monkeypatch, tmp_path):
+    import src.main as main
+    from src.prices import portfolio_time_series
+
+    calls = []
+    monkeypatch.setattr(main, "PRICE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "portfolio_time_series", lambda *args: calls.append(1) or portfolio_time_series(*args))
+    prices = b"date,asset,close\n2024-01-01,AAA,10\n2024-01-02,AAA,11\n"
+    holdings = pd.DataFrame({"Asset": ["AAA"], "Purchase_Date": pd.to_datetime(["2024-01-01"]),
+                             "Purchase_Price": [100.0]})
+
+    first = main.get_portfolio_history("prices-test", "holdings-test", prices, holdings)
+    second = main.get_portfolio_history("prices-test", "holdings-test", prices, holdings)
+
+    assert first is second and len(calls) == 1
+    skipped, (cumulative, _), figures = first
+    assert skipped == 0 and cumulative == pytest.approx(10.0) and len(figures) == 4
@@ -1,5 +1,6 @@
 import pytest
-from src.metrics import calculate_metrics
+import pandas as pd
+from src.metrics import RATIOS, calculate_metrics, calculate_metrics_batch, coerce_amounts, compute_ratios, iter_csv_batches, iter_csv_rows
 
 def test_calculate_metrics():
     # Test data
@@ -23,4 +24,75 @@ def test_calculate_metrics_zero_revenue():
     ]
     
     metrics = calculate_metrics(test_data)
-    assert metrics["Gross Profit Margin"] == 0.0
\ No newline at end of file
+    assert metrics["Gross Profit Margin"] == 0.0
+
+def test_calculate_metrics_streams_csv_rows(tmp_path):
+    csv_file = tmp_path / "pnl.csv"
+    csv_file.write_text(
+        "metric,amount_month_usd\n"
+        "Total Revenue,\"100,000\"\n"
+        "Gross Profit,40000\n"
+    )
+
+    rows = iter_csv_rows(csv_file)
+    assert not isinstance(rows, list)
+    assert calculate_metrics(rows)["Gross Profit Margin"] == 40.0
+
+    batches = list(iter_csv_batches(csv_file, batch_size=1))
+    assert [len(batch) for batch in batches] == [1, 1]
+    assert calculate_metrics(iter_csv_batches(csv_file, batch_size=1))["Gross Profit Margin"] == 40.0
+
+def test_compute_ratios_evaluates_many_statements():
+    matrix = pd.DataFrame(
+        {
+            "Total Revenue": [100000.0, 0.0, 50000.0],
+            "Gross Profit": [40000.0, 10.0, 25000.0],
+            "Interest Expense": [0.0, 0.0, 2500.0],
+            "Operating Profit (EBIT)": [30000.0, 5.0, 10000.0],
+        },
+        index=["2024-01", "2024-02", "2024-03"],
+    )
+
+    ratios = compute_ratios(matrix)
+
+    assert list(ratios.columns) == list(RATIOS)
+    assert ratios["Gross Profit Margin"].tolist() == [40.0, 0.0, 50.0]
+    assert ratios["Interest Coverage Ratio"].tolist() == [0.0, 0.0, 4.0]
+    assert ratios.loc["2024-01"].to_dict() == calculate_metrics([
+        {"metric": name, "amount_month_usd": value}
+        for name, value in matrix.loc["2024-01"].items()
+    ])
+
+def test_calculate_metrics_batch_matches_per_statement_results():
+    frame = pd.DataFrame({
+        "entity": ["A", "A", "A", "B", "B"],
+        "period": ["2024-01"] * 5,
+        "metric": ["Total Revenue", "Gross Profit", "Gross Profit", "Total Revenue", "Marketing & Advertising"],
+        "amount": ["1,000", "100", "300", 500, "50"],
+    })
+
+    table = calculate_metrics_batch(frame)
+
+    for (entity, period), group in frame.groupby(["entity", "period"]):
+        expected = calculate_metrics(
+            {"metric": row.metric, "amount_month_usd": row.amount} for row in group.itertuples()
+        )
+        assert table.loc[(entity, period)].to_dict() == expected
+    assert table.loc[("A", "2024-01"), "Gross Profit Margin"] == 30.0
+    assert table.loc[("B", "2024-01"), "Marketing Efficiency"] == 10.0
+
+def test_calculate_metrics_accepts_frames_with_formatted_amounts():
+    frame = pd.DataFrame({
+        "metric": [" Total Revenue", "Gross Profit", "Income Tax Expense", "Net Profit Before Tax", "Other Expenses"],
+        "amount_month_usd": ["$100,000.00", "40 000", "(2,500)", "€ 10,000", "n/a"],
+    })
+
+    from_frame = calculate_metrics(frame)
+    from_rows = calculate_metrics(frame.to_dict("records"))
+    from_series = calculate_metrics(frame.set_index("metric")["amount_month_usd"])
+
+    assert from_frame == from_rows == from_series
+    assert from_frame["Gross Profit Margin"] == 40.0
+    assert from_frame["Income Tax Percentage"] == -25.0
+    assert from_frame["Other Expenses Percentage"] == 0.0
+    assert coerce_amounts(frame["amount_month_usd"]).tolist() == [100000.0, 40000.0, -2500.0, 10000.0, 0.0]
@@ -0,0 +1,88 @@
+import gzip
+import io
+
+import pandas as pd
+from src.aggregation import aggregate_transactions
+from src.parallel import aggregate_sources, partition_sources, split_csv
+
+
+def make_csv(rows=60):
+    df = pd.DataFrame({
+        "Category": [f"Category {i % 7}" for i in range(rows)],
+        "Amount": [(i % 11 - 5) * 10.5 for i in range(rows)],
+        "Date": pd.date_range("2024-01-01", periods=rows, freq="D").strftime("%Y-%m-%d"),
+    })
+    return df, df.to_csv(index=False).encode("utf-8")
+
+def test_split_csv_keeps_every_row_once_with_header():
+    df, data = make_csv()
+
+    parts = split_csv(data, 4)
+
+    assert len(parts) == 4
+    assert all(part.startswith(b"Category,Amount,Date\n") for part in parts)
+    pd.testing.assert_frame_equal(pd.concat(pd.read_csv(io.BytesIO(p)) for p in parts)
+                                  .reset_index(drop=True), pd.read_csv(io.BytesIO(data)))
+
+def test_split_csv_never_cuts_quoted_multi_line_fields():
+    df = pd.DataFrame({
+        "Category": [f"Line one {i}\nline \"two\"\n" if i % 3 else f"Plain {i}" for i in range(30)],
+        "Amount": [float(i) for i in range(30)],
+        "Date": pd.date_range("2024-01-01", periods=30, freq="D").strftime("%Y-%m-%d"),
+    })
+    data = df.to_csv(index=False).encode("utf-8")
+
+    parts = split_csv(data, 7)
+
+    assert len(parts) > 1
+    pd.testing.assert_frame_equal(pd.concat(pd.read_csv(io.BytesIO(p)) for p in parts)
+                                  .reset_index(drop=True), pd.read_csv(io.BytesIO(data)))
+    assert aggregate_sources([data], max_workers=2)["rows"] == len(df)
+
+def test_parallel_aggregation_matches_in_memory_path():
+    df, data = make_csv()
+    half = len(df) // 2
+    second = df.iloc[half:].to_parquet(index=False)
+    first = df.iloc[:half].to_csv(index=False).encode("utf-8")
+
+    parallel = aggregate_sources([first, second], max_workers=2)
+    sequential = aggregate_sources([first, second], max_workers=1, chunksize=7)
+
+    expected = aggregate_transactions(df.assign(Date=pd.to_datetime(df["Date"])))
+    for result in (parallel, sequential):
+        assert result["rows"] == len(df)
+        assert round(result["total_income"], 6) == round(expected["total_income"], 6)
+        assert round(result["total_expenses"], 6) == round(expected["total_expenses"], 6)
+        pd.testing.assert_frame_equal(result["category_summary"], expected["category_summary"])
+
+def test_files_on_disk_are_partitioned_by_byte_range_and_row_group(tmp_path):
+    df, data = make_csv(200)
+    csv_path, parquet_path, gzip_path = tmp_path / "a.csv", tmp_path / "b.parquet", tmp_path / "c.csv.gz"
+    csv_path.write_bytes(data)
+    df.to_parquet(parquet_path, index=False, row_group_size=50)
+    gzip_path.write_bytes(gzip.compress(data))
+
+    partitions = partition_sources([str(csv_path), str(parquet_path), str(gzip_path)], 3)
+
+    assert [batches for _, batches, _ in partitions if batches] == [[0, 1], [2, 3]]
+    assert sum(byte_range is not None for _, _, byte_range in partitions) == 3
+    assert partitions[-1] == (str(gzip_path), None, None)
+    result = aggregate_sources([str(csv_path), str(parquet_path), str(gzip_path)], max_workers=2, chunksize=16)
+    assert result["rows"] == 3 * len(df)
+
+def test_uploads_are_spilled_to_disk_before_partitioning(monkeypatch):
+    import src.parallel as parallel
+
+    df, data = make_csv(200)
+    df.iloc[:100].to_parquet(columnar := io.BytesIO(), index=False, row_group_size=25)
+    upload = io.BytesIO(data)
+    seen = []
+    original = parallel.partition_sources
+    monkeypatch.setattr(parallel, "partition_sources",
+                        lambda sources, partitions: seen.extend(sources) or original(sources, partitions))
+
+    result = aggregate_sources([upload, columnar.getvalue()], max_workers=2, chunksize=16)
+
+    assert result["rows"] == 300
+    assert all(isinstance(source, str) for source in seen)
+    assert not upload.closed and upload.tell() == 0
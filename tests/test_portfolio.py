@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.portfolio import annualized_returns, portfolio_xirr, xirr
+
+
+def test_xirr_matches_closed_form_and_handles_losses():
+    assert xirr([-1000, 1100], ["2020-01-01", "2021-01-01"]) == pytest.approx(1.1 ** (365 / 366) - 1, abs=1e-9)
+    assert xirr([-1000, 100], ["2020-01-01", "2021-01-01"]) == pytest.approx(0.1 ** (365 / 366) - 1, abs=1e-9)
+    assert np.isnan(xirr([1000, 100], ["2020-01-01", "2021-01-01"]))
+
+def test_xirr_nets_same_day_flows():
+    split = xirr([-400, -600, 550, 550], ["2020-01-01", "2020-01-01", "2021-01-01", "2021-01-01"])
+
+    assert split == pytest.approx(xirr([-1000, 1100], ["2020-01-01", "2021-01-01"]))
+
+def test_annualized_returns_use_purchase_dates():
+    lots = pd.DataFrame({
+        "Purchase_Price": [100.0, 100.0, 100.0, 0.0],
+        "Current_Value": [121.0, 105.0, 150.0, 10.0],
+        "Purchase_Date": pd.to_datetime(["2022-01-01", "2023-07-01", "2026-01-01", "2023-01-01"]),
+    })
+
+    result = annualized_returns(lots["Purchase_Price"], lots["Current_Value"], lots["Purchase_Date"],
+                                as_of=pd.Timestamp("2022-01-01") + pd.Timedelta(days=730))
+
+    assert result.iloc[0] == pytest.approx(10.0)
+    # Held half a year: not annualized, and not mixed in as a plain holding-period return
+    assert np.isnan(result.iloc[1])
+    assert np.isnan(result.iloc[2]) and np.isnan(result.iloc[3])
+
+def test_portfolio_xirr_treats_current_value_as_one_proceed():
+    lots = pd.DataFrame({
+        "Purchase_Price": [500.0, 500.0],
+        "Current_Value": [600.0, 500.0],
+        "Purchase_Date": pd.to_datetime(["2023-01-01", "2023-01-01"]),
+    })
+
+    result = portfolio_xirr(lots["Purchase_Price"], lots["Current_Value"], lots["Purchase_Date"], as_of="2024-01-01")
+
+    assert result == pytest.approx(10.0)
+
+def test_weighted_returns_follow_position_size():
+    from src.portfolio import summarize_type_sums, type_sums
+
+    lots = pd.DataFrame({
+        "Type": ["Stock", "Stock", "Bond"],
+        "Purchase_Price": [100.0, 900.0, 1000.0],
+        "Current_Value": [300.0, 900.0, 800.0],
+        "Annual_Return": [50.0, 0.0, -10.0],
+    })
+
+    result = summarize_type_sums(type_sums(lots))
+
+    assert result["avg_return"] == pytest.approx(40 / 3)
+    assert result["value_weighted_return"] == pytest.approx((50 * 300 - 10 * 800) / 2000)
+    assert result["cost_weighted_return"] == pytest.approx((50 * 100 - 10 * 1000) / 2000)
+    assert result["type_returns"].loc["Stock", "Value_Weighted_Return"] == pytest.approx(12.5)
+    assert result["type_returns"].loc["Bond", "Cost_Weighted_Return"] == pytest.approx(-10.0)
+    assert result["type_distribution"].to_dict() == {"Bond": 800.0, "Stock": 1200.0}
+
+def test_type_sums_do_not_overflow_narrow_integer_columns():
+    from src.portfolio import summarize_type_sums, type_sums
+
+    lots = pd.DataFrame({
+        "Type": ["Stock", "Bond"],
+        "Purchase_Price": np.array([20000, 30000], dtype="int16"),
+        "Current_Value": np.array([24000, 32000], dtype="int16"),
+        "Annual_Return": np.array([20, 7], dtype="int8"),
+    })
+
+    result = summarize_type_sums(type_sums(lots))
+
+    assert result["value_weighted_return"] == pytest.approx((20 * 24000 + 7 * 32000) / 56000)
+    assert result["cost_weighted_return"] == pytest.approx((20 * 20000 + 7 * 30000) / 50000)
+    assert result["total_investment"] == 50000
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.prices import PriceMatrix, load_price_history, portfolio_time_series, time_weighted_return
+
+
+PRICES = pd.DataFrame({
+    "date": ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"] * 2,
+    "asset": ["AAA"] * 4 + ["BBB"] * 4,
+    "close": [10.0, 11.0, 12.0, 9.0, 100.0, None, 110.0, 110.0],
+})
+
+def test_price_history_cache_is_memory_mapped(tmp_path):
+    data = PRICES.to_csv(index=False).encode("utf-8")
+
+    built = load_price_history(data, tmp_path)
+    cached = load_price_history(data, tmp_path)
+
+    assert isinstance(cached.closes, np.memmap)
+    np.testing.assert_array_equal(cached.closes, built.closes)
+    assert cached.closes[1, 1] == 100.0  # forward-filled gap
+    assert cached.assets.tolist() == ["AAA", "BBB"]
+
+def test_portfolio_time_series_excludes_purchases_from_returns():
+    holdings = pd.DataFrame({
+        "Asset": ["AAA", "BBB", "ZZZ"],
+        "Purchase_Date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-01"]),
+        "Purchase_Price": [100.0, 1000.0, 5.0],
+    })
+
+    series, skipped = portfolio_time_series(holdings, PriceMatrix.from_frame(PRICES), window=2)
+
+    assert skipped == 1
+    assert series["Value"].tolist() == pytest.approx([100.0, 1110.0, 1220.0, 1190.0])
+    assert series["Drawdown"].iloc[-1] == pytest.approx((1190 / 1220 - 1) * 100)
+    assert series["Drawdown"].iloc[:3].tolist() == [0.0, 0.0, 0.0]
+    assert np.isnan(series["Volatility"].iloc[1]) and np.isfinite(series["Volatility"].iloc[3])
+    cumulative, annual = time_weighted_return(series)
+    assert cumulative == pytest.approx((1.1 * 1190 / 1110 - 1) * 100)
+    assert np.isnan(annual)
+
+def test_time_weighted_return_is_annualized_over_full_years():
+    series = pd.DataFrame({"Date": pd.to_datetime(["2022-01-01", "2024-01-01"]), "Cumulative_Return": [0.0, 21.0]})
+
+    cumulative, annual = time_weighted_return(series)
+
+    assert cumulative == 21.0
+    assert annual == pytest.approx((1.21 ** (365 / 730) - 1) * 100)
@@ -0,0 +1,49 @@
+import pytest
+from src.report_cache import ResponseCache
+
+
+def make_request(prompt):
+    return {
+        "model": "gpt-4",
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": 1000,
+        "temperature": 0.7,
+    }
+
+def test_cache_round_trip_and_key_covers_parameters(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    request = make_request("How is my margin?")
+
+    assert cache.get(request) is None
+    cache.set(request, "Healthy.")
+
+    assert ResponseCache(tmp_path / "cache.sqlite").get(request) == "Healthy."
+    assert cache.get({**request, "temperature": 0.2}) is None
+    assert cache.get({**request, "model": "gpt-4o"}) is None
+
+def test_cache_expires_entries_after_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.report_cache.time.time", lambda: now[0])
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl_seconds=60)
+    cache.set(make_request("a"), "A")
+
+    now[0] += 61
+    assert cache.get(make_request("a")) is None
+    assert len(cache) == 0
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.report_cache.time.time", lambda: now[0])
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=2)
+    for prompt in ("a", "b"):
+        now[0] += 1
+        cache.set(make_request(prompt), prompt.upper())
+
+    now[0] += 1
+    assert cache.get(make_request("a")) == "A"
+    now[0] += 1
+    cache.set(make_request("c"), "C")
+
+    assert len(cache) == 2
+    assert cache.get(make_request("b")) is None
+    assert cache.get(make_request("a")) == "A"
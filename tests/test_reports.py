@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import API
+
+
+@pytest.fixture(autouse=True)
+def fresh_client(monkeypatch):
+    # The shared client is bound to the base URL of the stub that was running when it was created
+    monkeypatch.setattr(API, "_client", None)
+
+def test_importing_api_has_no_side_effects():
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    code = (
+        "import sys, API; "
+        "print(sorted(m for m in ('openai', 'dotenv', 'pandas', 'plotly', 'streamlit') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+def test_generate_reports_preserves_order_and_bounds_concurrency(openai_stub):
+    prompts = [{"prompt": f"question {i}"} for i in range(8)]
+
+    reports = API.generate_reports(prompts, max_concurrency=3, use_cache=False)
+
+    assert reports == [f"echo: question {i}" for i in range(8)]
+    assert 1 < openai_stub.max_in_flight <= 3
+    assert len(openai_stub.requests) == 8
+
+def test_agenerate_report_retries_rate_limited_requests(openai_stub):
+    openai_stub.rate_limited = 2
+
+    reports = API.generate_reports([{"prompt": "retry me"}], base_delay=0.01, use_cache=False)
+
+    assert reports == ["echo: retry me"]
+    assert len(openai_stub.requests) == 3
+
+def test_agenerate_report_gives_up_after_max_retries(openai_stub):
+    openai_stub.rate_limited = 5
+
+    with pytest.raises(RuntimeError, match="OpenAI API error"):
+        API.generate_reports([{"prompt": "too busy"}], max_retries=1, base_delay=0.01, use_cache=False)
+    assert len(openai_stub.requests) == 2
+
+def test_generate_report_streams_chunks_and_caches_full_text(openai_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(API, "_report_cache", API.ResponseCache(tmp_path / "cache.sqlite"))
+
+    chunks = list(API.generate_report({"prompt": "stream this"}, stream=True))
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == "echo: stream this "
+    assert list(API.generate_report({"prompt": "stream this"}, stream=True)) == ["echo: stream this "]
+    assert API.generate_report({"prompt": "stream this"}) == "echo: stream this "
+    assert len(openai_stub.requests) == 1
+
+def test_cached_batches_need_no_client_or_api_key(openai_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(API, "_report_cache", API.ResponseCache(tmp_path / "cache.sqlite"))
+    prompts = [{"prompt": "cached one"}, {"prompt": "cached two"}]
+    assert API.generate_reports(prompts) == ["echo: cached one", "echo: cached two"]
+
+    monkeypatch.delenv("OPENAI_API_KEY")
+
+    assert API.generate_reports(prompts) == ["echo: cached one", "echo: cached two"]
+    assert len(openai_stub.requests) == 2
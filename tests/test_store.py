@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+from src.aggregation import aggregate_transactions
+from src.main import analyze_investment_portfolio
+from src.store import DatasetStore
+
+
+TRANSACTIONS = pd.DataFrame({
+    "Category": ["Salary", "Rent", "Food", "Food", "Refund"],
+    "Amount": [5000.0, -1500.0, -80.5, -19.5, 25.0],
+    "Date": pd.to_datetime(["2024-10-01", "2024-10-02", "2024-10-15", "2024-11-04", "2024-11-05"]),
+})
+
+PORTFOLIO = pd.DataFrame({
+    "Asset": ["AAPL", "BND", "MSFT"],
+    "Type": ["Stock", "Bond", "Stock"],
+    "Purchase_Date": pd.to_datetime(["2023-01-15", "2023-03-01", "2023-06-30"]),
+    "Purchase_Price": [150.0, 80.0, 250.0],
+    "Current_Value": [180.0, 78.0, 330.0],
+    "Annual_Return": [20.0, -2.5, 32.0],
+})
+
+
+def test_store_ingests_once_and_loads_back(tmp_path):
+    store = DatasetStore(tmp_path / "store.sqlite")
+
+    assert store.ingest("personal_finance", TRANSACTIONS, "hash-1")
+    assert not store.ingest("personal_finance", TRANSACTIONS, "hash-1")
+
+    reopened = DatasetStore(tmp_path / "store.sqlite")
+    assert reopened.has_dataset("personal_finance", "hash-1")
+    loaded = reopened.load("personal_finance", "hash-1")
+    pd.testing.assert_frame_equal(loaded, TRANSACTIONS, check_dtype=False)
+
+def test_store_keys_datasets_on_kind(tmp_path):
+    store = DatasetStore(tmp_path / "store.sqlite")
+    store.ingest("personal_finance", TRANSACTIONS, "same-bytes")
+
+    assert not store.has_dataset("investment_portfolio", "same-bytes")
+    with pytest.raises(KeyError):
+        store.load("investment_portfolio", "same-bytes")
+    assert store.ingest("investment_portfolio", PORTFOLIO, "same-bytes")
+    assert len(store.load("investment_portfolio", "same-bytes")) == len(PORTFOLIO)
+
+def test_store_migrates_datasets_keyed_on_hash_only(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "store.sqlite"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE datasets (dataset_id TEXT PRIMARY KEY, kind TEXT NOT NULL, name TEXT, "
+                     "row_count INTEGER NOT NULL, ingested_at REAL NOT NULL)")
+        conn.execute("INSERT INTO datasets VALUES ('old', 'profit_loss', NULL, 0, 0)")
+    conn.close()
+
+    store = DatasetStore(path)
+
+    assert store.has_dataset("profit_loss", "old")
+    assert store.ingest("personal_finance", TRANSACTIONS, "old")
+
+def test_personal_finance_summary_pushes_filters_down(tmp_path):
+    store = DatasetStore(tmp_path / "store.sqlite")
+    store.ingest("personal_finance", TRANSACTIONS, "hash-1")
+
+    summary = store.personal_finance_summary("hash-1")
+    expected = aggregate_transactions(TRANSACTIONS)
+    assert summary["total_income"] == expected["total_income"]
+    assert summary["total_expenses"] == expected["total_expenses"]
+    pd.testing.assert_frame_equal(summary["category_summary"], expected["category_summary"])
+
+    october_food = store.personal_finance_summary("hash-1", start="2024-10-01", end="2024-10-31", categories=["Food"])
+    assert october_food["total_expenses"] == 80.5
+    assert october_food["total_income"] == 0
+
+def test_portfolio_summary_aggregates_by_type(tmp_path):
+    store = DatasetStore(tmp_path / "store.sqlite")
+    store.ingest("investment_portfolio", PORTFOLIO, "hash-2")
+
+    summary = store.portfolio_summary("hash-2")
+    assert summary["total_investment"] == 480.0
+    assert summary["total_gain_loss"] == 108.0
+    assert summary["avg_return"] == pytest.approx(PORTFOLIO["Annual_Return"].mean())
+    assert summary["type_distribution"].to_dict() == {"Bond": 78.0, "Stock": 510.0}
+    assert store.portfolio_summary("hash-2", types=["Bond"])["current_value"] == 78.0
+
+    expected = analyze_investment_portfolio(PORTFOLIO, as_of="2024-06-01")
+    summary = store.portfolio_summary("hash-2", as_of="2024-06-01")
+    for key in ("value_weighted_return", "cost_weighted_return", "xirr"):
+        assert summary[key] == pytest.approx(expected[key])
+    pd.testing.assert_frame_equal(summary["type_returns"], expected["type_returns"], check_names=False)